@@ -0,0 +1,69 @@
+"""Configuración de gunicorn.
+
+gunicorn la toma sola si se lo arranca desde esta carpeta (``gunicorn``, o
+``ASGI=1 gunicorn``). La aplicación sale de ``wsgi_app``: un módulo en la línea de
+comandos tiene prioridad, y ``gunicorn lector.wsgi`` con ``ASGI=1`` le daría una
+aplicación WSGI a los workers de uvicorn.
+Cada worker conserva sus conexiones a la base entre requests (``CONN_MAX_AGE``);
+``max_requests`` recicla los workers de a uno (con jitter para que no se reinicien
+todos juntos) y al salir cierran sus conexiones en lugar de dejarlas colgadas.
+
+Con ``preload_app`` la aplicación (settings, Unfold, admin) se importa una vez en
+el master, que además arma URLs y plantillas (``inventario.arranque``); los
+workers nacen por fork con todo eso hecho y sólo cargan sus catálogos. Para tomar
+código nuevo hay que reiniciar gunicorn (``HUP`` no alcanza); ``GUNICORN_PRELOAD=0``
+vuelve a cargar la aplicación en cada worker.
+"""
+import os
+
+# ASGI=1: workers de uvicorn con ``lector.asgi``; las exportaciones y la API de
+# reportes no ocupan el worker mientras esperan al cliente o a la base.
+if os.environ.get("ASGI", "").lower() in ("1", "true", "yes", "on"):
+    worker_class = "uvicorn_worker.UvicornWorker"
+    wsgi_app = "lector.asgi:application"
+else:
+    wsgi_app = "lector.wsgi:application"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+
+def _ms(tiempos):
+    return ", ".join(f"{paso} {segundos * 1000:.0f} ms" for paso, segundos in tiempos.items())
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from inventario import arranque, conexiones
+
+    server.log.info("Calentado en el master: %s", _ms(arranque.calentar(base=False)))
+    # Ninguna conexión abierta en el master debe pasar a los workers por fork.
+    conexiones.cerrar_todas()
+
+
+def post_worker_init(worker):
+    from django.conf import settings
+
+    from inventario import arranque, conexiones
+
+    worker.log.info("Worker %s calentado: %s", worker.pid, _ms(arranque.calentar()))
+    if settings.DB_CONN_MAX_AGE == 0:
+        # Sin persistencia (p.ej. ASGI) la conexión de los catálogos no se volvería a usar.
+        conexiones.cerrar_todas()
+
+
+def worker_exit(server, worker):
+    from django.conf import settings
+
+    if settings.configured:
+        from inventario import conexiones
+
+        conexiones.cerrar_todas()
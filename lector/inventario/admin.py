@@ -1,10 +1,22 @@
-from django.contrib import admin
+from decimal import Decimal
+
+from django.contrib import admin, messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.db.models import DecimalField
 from django.forms import TextInput
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
 
 from unfold.contrib.filters.admin import RangeDateFilter
 
-from . import models
+from . import catalogos, compromisos, cuotas, exports, ledger, models, proyeccion
+from .changelist import EstimatedCountPaginator, KeysetChangeList
+from .forms import CuotaCeldaForm
+
+admin.site.index_template = "admin/custom_dashboard.html"
 
 
 # ========== Utilidades ==========
@@ -15,51 +27,177 @@ class MoneyAdminMixin:
     }
 
 
+class CatalogoAdminMixin:
+    """Búsqueda (y autocomplete) por prefijo de palabra sobre el cache de catálogos."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(pk__in=catalogos.buscar(self.model, search_term)), False
+
+
+class CatalogoFilter(admin.RelatedFieldListFilter):
+    """Filtro lateral por catálogo que toma las opciones del cache en lugar de consultar la base."""
+
+    def field_choices(self, field, request, model_admin):
+        return catalogos.opciones(field.related_model)
+
+
+def columna_catalogo(model, campo):
+    """Columna de ``list_display`` que muestra el nombre del catálogo sin JOIN ni consulta por fila."""
+    field = model._meta.get_field(campo)
+
+    @admin.display(description=field.verbose_name, ordering=f"{campo}__nombre")
+    def columna(obj):
+        return catalogos.nombre(field.related_model, getattr(obj, field.attname))
+
+    columna.__name__ = campo
+    return columna
+
+
+class ExportAdminMixin:
+    """Acciones y botones del changelist para exportar a CSV/XLSX en streaming.
+
+    ``export_fields`` admite campos del modelo y propiedades; ``export_select_related``
+    lista los catálogos a traer en la misma consulta.
+    """
+    export_fields = []
+    export_select_related = []
+    actions = ["exportar_csv", "exportar_xlsx"]
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                "exportar/<str:formato>/",
+                self.admin_site.admin_view(self.exportar_view),
+                name="%s_%s_exportar" % info,
+            ),
+        ] + super().get_urls()
+
+    def get_changelist(self, request, **kwargs):
+        ChangeList = super().get_changelist(request, **kwargs)
+        if not getattr(request, "exportando", False):
+            return ChangeList
+
+        class ExportChangeList(ChangeList):
+            def get_results(self, request):
+                """Para exportar sólo hace falta el queryset filtrado: sin COUNT ni paginado."""
+
+        return ExportChangeList
+
+    def exportar_view(self, request, formato):
+        """Exporta el changelist con los mismos filtros, búsqueda y orden de la pantalla."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        request.exportando = True
+        try:
+            cl = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return HttpResponseRedirect(request.path.rsplit("exportar/", 1)[0] + "?e=1")
+        return self._exportar(request, cl.get_queryset(request), formato)
+
+    def _exportar(self, request, queryset, formato):
+        return exports.respuesta(
+            queryset,
+            self.export_fields,
+            formato,
+            model_admin=self,
+            select_related=self.export_select_related,
+            asincrono=exports.es_asgi(request),
+        )
+
+    @admin.action(description="Exportar seleccionados a CSV", permissions=["view"])
+    def exportar_csv(self, request, queryset):
+        return self._exportar(request, queryset, "csv")
+
+    @admin.action(description="Exportar seleccionados a XLSX", permissions=["view"])
+    def exportar_xlsx(self, request, queryset):
+        return self._exportar(request, queryset, "xlsx")
+
+
+class KeysetAdminMixin:
+    """Paginado por cursor ``(fecha, id)`` y sin ``COUNT(*)`` del total en los libros grandes."""
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+class SaldoCorridoAdminMixin:
+    """Recalcula el saldo de las filas posteriores al movimiento guardado o borrado.
+
+    El saldo deja de cargarse a mano: se agrega a ``readonly_fields`` en cada admin.
+    """
+
+    def save_model(self, request, obj, form, change):
+        desde = None
+        if change and "fecha" in form.changed_data:
+            desde = (form.initial["fecha"], obj.pk)
+        if obj.saldo is None:
+            obj.saldo = Decimal("0.00")
+        super().save_model(request, obj, form, change)
+        desde = min(filter(None, [desde, (obj.fecha, obj.pk)]))
+        ledger.recalcular_saldos(self.model, *desde)
+
+    def delete_model(self, request, obj):
+        desde = (obj.fecha, obj.pk)
+        super().delete_model(request, obj)
+        ledger.recalcular_saldos(self.model, *desde)
+
+    def delete_queryset(self, request, queryset):
+        desde = queryset.order_by("fecha", "pk").values_list("fecha", "pk").first()
+        super().delete_queryset(request, queryset)
+        if desde:
+            ledger.recalcular_saldos(self.model, *desde)
+
+
 # ========== Lookups / Catálogos ==========
 @admin.register(models.EstadoVencimiento)
-class EstadoVencimientoAdmin(admin.ModelAdmin):
+class EstadoVencimientoAdmin(CatalogoAdminMixin, admin.ModelAdmin):
     search_fields = ["nombre"]
     list_display = ["nombre"]
     ordering = ["nombre"]
 
 
 @admin.register(models.Concepto)
-class ConceptoAdmin(admin.ModelAdmin):
+class ConceptoAdmin(CatalogoAdminMixin, admin.ModelAdmin):
     search_fields = ["nombre"]
     list_display = ["nombre"]
     ordering = ["nombre"]
 
 
 @admin.register(models.Situacion)
-class SituacionAdmin(admin.ModelAdmin):
+class SituacionAdmin(CatalogoAdminMixin, admin.ModelAdmin):
     search_fields = ["nombre"]
     list_display = ["nombre"]
     ordering = ["nombre"]
 
 
 @admin.register(models.Descripcion)
-class DescripcionAdmin(admin.ModelAdmin):
+class DescripcionAdmin(CatalogoAdminMixin, admin.ModelAdmin):
     search_fields = ["nombre"]
     list_display = ["nombre"]
     ordering = ["nombre"]
 
 
 @admin.register(models.EstadoMoneda)
-class EstadoMonedaAdmin(admin.ModelAdmin):
+class EstadoMonedaAdmin(CatalogoAdminMixin, admin.ModelAdmin):
     search_fields = ["nombre"]
     list_display = ["nombre"]
     ordering = ["nombre"]
 
 
 @admin.register(models.RetiroBuzon)
-class RetiroBuzonAdmin(admin.ModelAdmin):
+class RetiroBuzonAdmin(CatalogoAdminMixin, admin.ModelAdmin):
     search_fields = ["nombre"]
     list_display = ["nombre"]
     ordering = ["nombre"]
 
 
 @admin.register(models.EntregadoA)
-class EntregadoAAdmin(admin.ModelAdmin):
+class EntregadoAAdmin(CatalogoAdminMixin, admin.ModelAdmin):
     search_fields = ["nombre"]
     list_display = ["nombre"]
     ordering = ["nombre"]
@@ -67,29 +205,59 @@ class EntregadoAAdmin(admin.ModelAdmin):
 
 # ========== Core ==========
 @admin.register(models.Caja)
-class CajaAdmin(MoneyAdminMixin, admin.ModelAdmin):
+class CajaAdmin(ExportAdminMixin, KeysetAdminMixin, SaldoCorridoAdminMixin, MoneyAdminMixin, admin.ModelAdmin):
     date_hierarchy = "fecha"
     list_display = ["fecha", "descripcion", "ingreso", "egreso", "saldo"]
     list_filter = (("fecha", RangeDateFilter),)
     search_fields = ["descripcion"]
     ordering = ["-fecha", "-id"]
 
+    export_fields = ["fecha", "descripcion", "ingreso", "egreso", "saldo"]
+
     fieldsets = (
         ("Movimiento", {"classes": ("tab",), "fields": ("fecha", "descripcion")}),
         ("Valores", {"classes": ("tab",), "fields": (("ingreso", "egreso", "saldo"),)}),
         ("Metadatos", {"classes": ("tab",), "fields": (("created_at", "updated_at"),)}),
     )
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = ("saldo", "created_at", "updated_at")
+
+    def get_urls(self):
+        return [
+            path(
+                "proyeccion/",
+                self.admin_site.admin_view(self.proyeccion_view),
+                name="%s_%s_proyeccion" % (self.opts.app_label, self.opts.model_name),
+            ),
+        ] + super().get_urls()
+
+    def proyeccion_view(self, request):
+        """Saldo proyectado de Caja + MP para los próximos días (ver ``inventario.proyeccion``)."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            dias = min(int(request.GET.get("dias", proyeccion.HORIZONTE)), 365)
+        except ValueError:
+            dias = proyeccion.HORIZONTE
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "title": "Proyección de saldo",
+            "dias": dias,
+            "proyeccion": proyeccion.proyectar(dias=dias),
+        }
+        return TemplateResponse(request, "admin/inventario/proyeccion.html", context)
 
 
 @admin.register(models.MP)
-class MPAdmin(MoneyAdminMixin, admin.ModelAdmin):
+class MPAdmin(ExportAdminMixin, KeysetAdminMixin, MoneyAdminMixin, admin.ModelAdmin):
     date_hierarchy = "fecha"
     list_display = ["fecha", "ingreso", "egreso", "ganancia", "saldo"]
     list_filter = (("fecha", RangeDateFilter),)
     search_fields = []
     ordering = ["-fecha", "-id"]
 
+    export_fields = ["fecha", "ingreso", "egreso", "ganancia", "saldo"]
+
     fieldsets = (
         ("Movimiento", {"classes": ("tab",), "fields": ("fecha",)}),
         ("Valores", {"classes": ("tab",), "fields": (("ingreso", "egreso", "ganancia", "saldo"),)}),
@@ -99,30 +267,42 @@ class MPAdmin(MoneyAdminMixin, admin.ModelAdmin):
 
 
 @admin.register(models.Vencimiento)
-class VencimientoAdmin(MoneyAdminMixin, admin.ModelAdmin):
+class VencimientoAdmin(ExportAdminMixin, MoneyAdminMixin, admin.ModelAdmin):
     date_hierarchy = "fecha_vencimiento"
     list_display = [
         "fecha_vencimiento",
-        "concepto",
-        "descripcion",
+        columna_catalogo(models.Vencimiento, "concepto"),
+        columna_catalogo(models.Vencimiento, "descripcion"),
         "importe",
-        "estado",
-        "situacion",
+        columna_catalogo(models.Vencimiento, "estado"),
+        columna_catalogo(models.Vencimiento, "situacion"),
         "fecha",
     ]
     list_filter = (
         ( "fecha_vencimiento", RangeDateFilter),
         ("fecha", RangeDateFilter),
-        "concepto",
-        "estado",
-        "situacion",
-        "descripcion",
+        ("concepto", CatalogoFilter),
+        ("estado", CatalogoFilter),
+        ("situacion", CatalogoFilter),
+        ("descripcion", CatalogoFilter),
     )
     search_fields = ["nota"]
     ordering = ["-fecha_vencimiento", "concepto__nombre"]
 
     autocomplete_fields = ["concepto", "descripcion", "estado", "situacion"]
 
+    export_fields = [
+        "fecha",
+        "fecha_vencimiento",
+        "concepto",
+        "descripcion",
+        "importe",
+        "estado",
+        "situacion",
+        "nota",
+    ]
+    export_select_related = ["concepto", "descripcion", "estado", "situacion"]
+
     fieldsets = (
         ("Datos", {"classes": ("tab",), "fields": (("fecha", "fecha_vencimiento"), ("concepto", "descripcion"))}),
         ("Estado", {"classes": ("tab",), "fields": (("estado", "situacion"),)}),
@@ -133,7 +313,7 @@ class VencimientoAdmin(MoneyAdminMixin, admin.ModelAdmin):
 
 
 @admin.register(models.MonedaExtranjera)
-class MonedaExtranjeraAdmin(MoneyAdminMixin, admin.ModelAdmin):
+class MonedaExtranjeraAdmin(ExportAdminMixin, MoneyAdminMixin, admin.ModelAdmin):
     date_hierarchy = "fecha"
     list_display = [
         "fecha",
@@ -145,13 +325,28 @@ class MonedaExtranjeraAdmin(MoneyAdminMixin, admin.ModelAdmin):
         "usd_hoy",
         "venta_ars",
         "saldo_ars",
-        "estado",
+        columna_catalogo(models.MonedaExtranjera, "estado"),
     ]
-    list_filter = (("fecha", RangeDateFilter), "codigo", "estado")
+    list_filter = (("fecha", RangeDateFilter), "codigo", ("estado", CatalogoFilter))
     search_fields = []
     ordering = ["-fecha", "-id"]
     autocomplete_fields = ["estado"]
 
+    export_fields = [
+        "fecha",
+        "codigo",
+        "ingreso",
+        "compra_usd",
+        "compra_ars",
+        "egreso_usd",
+        "usd_hoy",
+        "venta_ars",
+        "saldo_ars",
+        "usd_revaluacion",
+        "estado",
+    ]
+    export_select_related = ["estado"]
+
     fieldsets = (
         ("Datos", {"classes": ("tab",), "fields": (("fecha", "codigo"), "estado")}),
         ("Movimientos", {
@@ -160,11 +355,28 @@ class MonedaExtranjeraAdmin(MoneyAdminMixin, admin.ModelAdmin):
                 ("ingreso", "egreso_usd"),
                 ("compra_usd", "compra_ars"),
                 ("venta_ars", "usd_hoy"),
-                "saldo_ars",
+                ("saldo_ars", "usd_revaluacion"),
             ),
         }),
         ("Metadatos", {"classes": ("tab",), "fields": (("created_at", "updated_at"),)}),
     )
+    readonly_fields = ("usd_revaluacion", "created_at", "updated_at")
+
+
+@admin.register(models.Cotizacion)
+class CotizacionAdmin(ExportAdminMixin, admin.ModelAdmin):
+    date_hierarchy = "fecha"
+    list_display = ["fecha", "codigo", "valor"]
+    list_filter = (("fecha", RangeDateFilter), "codigo")
+    search_fields = ["codigo"]
+    ordering = ["-fecha", "codigo"]
+
+    export_fields = ["fecha", "codigo", "valor"]
+
+    fieldsets = (
+        ("Cotización", {"classes": ("tab",), "fields": (("fecha", "codigo"), "valor")}),
+        ("Metadatos", {"classes": ("tab",), "fields": (("created_at", "updated_at"),)}),
+    )
     readonly_fields = ("created_at", "updated_at")
 
 
@@ -178,15 +390,18 @@ class AsignacionSobresAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.Compromiso)
-class CompromisoAdmin(MoneyAdminMixin, admin.ModelAdmin):
+class CompromisoAdmin(ExportAdminMixin, MoneyAdminMixin, admin.ModelAdmin):
     date_hierarchy = "fecha"
-    list_display = ["fecha", "n_sobre", "nombre_hermano", "importe", "saldo"]
+    list_display = ["fecha", "n_sobre", "nombre_hermano", "importe", "saldo", "saldo_sobre"]
     list_select_related = ["asignacion"]
     list_filter = (("fecha", RangeDateFilter),)
     search_fields = ["asignacion__hermano"]
     ordering = ["-fecha", "-id"]
     autocomplete_fields = ["asignacion"]
 
+    export_fields = ["fecha", "n_sobre", "nombre_hermano", "importe", "saldo"]
+    export_select_related = ["asignacion"]
+
     # Solo mostramos asignación; n_sobre y nombre_hermano vienen por propiedades
     fieldsets = (
         ("Datos", {"classes": ("tab",), "fields": ("fecha", "asignacion")}),
@@ -196,16 +411,80 @@ class CompromisoAdmin(MoneyAdminMixin, admin.ModelAdmin):
     )
     readonly_fields = ("n_sobre", "nombre_hermano", "created_at", "updated_at")
 
+    @admin.display(description="Saldo del sobre")
+    def saldo_sobre(self, obj):
+        return getattr(obj, "saldo_sobre", None)
+
+    def get_list_display(self, request):
+        # Con saldo incremental la columna saldo ya es el saldo del sobre.
+        if compromisos.incremental():
+            return [campo for campo in self.list_display if campo != "saldo_sobre"]
+        return self.list_display
+
+    def get_readonly_fields(self, request, obj=None):
+        if compromisos.incremental():
+            return ("saldo", *self.readonly_fields)
+        return self.readonly_fields
+
+    def get_changelist(self, request, **kwargs):
+        ChangeList = super().get_changelist(request, **kwargs)
+        if compromisos.incremental() or getattr(request, "exportando", False):
+            return ChangeList
+
+        class SaldoSobreChangeList(ChangeList):
+            def get_results(self, request):
+                super().get_results(request)
+                compromisos.completar_saldos(list(self.result_list))
+
+        return SaldoSobreChangeList
+
+    def get_urls(self):
+        return [
+            path(
+                "atrasos/",
+                self.admin_site.admin_view(self.atrasos_view),
+                name="%s_%s_atrasos" % (self.opts.app_label, self.opts.model_name),
+            ),
+        ] + super().get_urls()
+
+    def atrasos_view(self, request):
+        """Atrasos de aportes de todos los sobres (ver ``inventario.compromisos.atrasos``)."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        filas = compromisos.atrasos()
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "title": "Atrasos por sobre",
+            "filas": filas,
+            "total_atraso": sum((fila["atraso"] for fila in filas), ledger.CERO),
+        }
+        return TemplateResponse(request, "admin/inventario/compromisos_atrasos.html", context)
+
 
 @admin.register(models.OfrendaDonacion)
-class OfrendaDonacionAdmin(MoneyAdminMixin, admin.ModelAdmin):
+class OfrendaDonacionAdmin(ExportAdminMixin, KeysetAdminMixin, MoneyAdminMixin, admin.ModelAdmin):
     date_hierarchy = "fecha"
-    list_display = ["fecha", "retiro_buzon", "entregado_a", "importe", "saldo", "concepto"]
-    list_filter = (("fecha", RangeDateFilter), "retiro_buzon", "entregado_a")
+    list_display = [
+        "fecha",
+        columna_catalogo(models.OfrendaDonacion, "retiro_buzon"),
+        columna_catalogo(models.OfrendaDonacion, "entregado_a"),
+        "importe",
+        "saldo",
+        "concepto",
+    ]
+    list_filter = (
+        ("fecha", RangeDateFilter),
+        ("retiro_buzon", CatalogoFilter),
+        ("entregado_a", CatalogoFilter),
+    )
     search_fields = ["concepto"]
     ordering = ["-fecha", "-id"]
     autocomplete_fields = ["retiro_buzon", "entregado_a"]
 
+    export_fields = ["fecha", "retiro_buzon", "entregado_a", "importe", "saldo", "concepto"]
+    export_select_related = ["retiro_buzon", "entregado_a"]
+
     fieldsets = (
         ("Datos", {"classes": ("tab",), "fields": (("fecha",), ("retiro_buzon", "entregado_a"))}),
         ("Valores", {"classes": ("tab",), "fields": (("importe", "saldo"), "concepto")}),
@@ -226,3 +505,80 @@ class CuotaInacAdmin(admin.ModelAdmin):
         ("Cuota", {"classes": ("tab",), "fields": (("anio", "mes"), "hermano")}),
         ("Metadatos", {"classes": ("tab",), "fields": (("created_at", "updated_at"),)}),
     )
+
+    def get_urls(self):
+        return [
+            path(
+                "matriz/",
+                self.admin_site.admin_view(self.matriz_view),
+                name="%s_%s_matriz" % (self.opts.app_label, self.opts.model_name),
+            ),
+        ] + super().get_urls()
+
+    def matriz_view(self, request):
+        """Grilla hermano × mes del año; con POST marca como pagas las celdas tildadas."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        pedido = request.GET.get("anio", timezone.localdate().year)
+        try:
+            anio = CuotaCeldaForm.base_fields["anio"].clean(pedido)
+        except ValidationError:
+            anio = timezone.localdate().year
+
+        if request.method == "POST":
+            if not self.has_add_permission(request):
+                raise PermissionDenied
+            tildadas = [valor.partition("|")[::2] for valor in request.POST.getlist("celda")]
+            nuevo = request.POST.get("hermano_nuevo", "").strip()
+            if nuevo:
+                tildadas += [(mes, nuevo) for mes in request.POST.getlist("mes_nuevo")]
+            celdas, rechazadas = [], []
+            for mes, hermano in tildadas:
+                # El año del pedido sin corregir: uno inválido rechaza las celdas en vez de marcar otro año.
+                form = CuotaCeldaForm({"hermano": hermano, "anio": pedido, "mes": mes})
+                if form.is_valid():
+                    celdas.append((form.cleaned_data["hermano"], form.cleaned_data["anio"], form.cleaned_data["mes"]))
+                else:
+                    errores = " ".join(error for lista in form.errors.values() for error in lista)
+                    rechazadas.append(f"{hermano or '?'} ({mes}): {errores}")
+            if rechazadas:
+                self.message_user(request, "No se marcaron: " + "; ".join(rechazadas), messages.ERROR)
+            if celdas:
+                agregadas = cuotas.marcar_pagas(celdas)
+                self.message_user(request, f"{agregadas} cuotas marcadas como pagas.", messages.SUCCESS)
+            return HttpResponseRedirect(f"{request.path}?anio={anio}")
+
+        filas = [
+            {"hermano": hermano, "meses": [(mes, mascara & cuotas.bit(mes)) for mes in cuotas.MESES],
+             "pagas": len(cuotas.pagados(mascara))}
+            for hermano, mascara in cuotas.matriz(anio).items()
+        ]
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "title": f"Cuotas INAC {anio}",
+            "anio": anio,
+            "meses": models.CuotaInac.Mes.choices,
+            "filas": filas,
+            "atrasados": sum(1 for fila in filas if fila["pagas"] < 12),
+            "puede_marcar": self.has_add_permission(request),
+        }
+        return TemplateResponse(request, "admin/inventario/cuotas_matriz.html", context)
+
+
+# ========== Resúmenes ==========
+@admin.register(models.ResumenDiario)
+class ResumenDiarioAdmin(admin.ModelAdmin):
+    """Solo lectura: lo mantienen las señales y ``manage.py rebuild_rollups``."""
+    list_display = ["libro", "anio", "mes", "dia", "ingreso", "egreso", "ganancia", "importe", "saldo_cierre", "movimientos"]
+    list_filter = ["libro", "anio", "mes"]
+    ordering = ["libro", "-anio", "-mes", "-dia"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
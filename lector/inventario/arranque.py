@@ -0,0 +1,106 @@
+"""Calentamiento de un proceso recién arrancado y medición del arranque.
+
+El primer request de un worker paga armar las tablas de URLs, evaluar los
+``reverse_lazy`` del sidebar de Unfold, compilar las plantillas del admin y
+cargar los catálogos. ``calentar()`` hace ese trabajo por adelantado: con
+``preload_app`` la parte sin base corre una vez en el master de gunicorn y los
+workers la heredan al hacer fork; los catálogos (cache por proceso) se cargan en
+cada worker.
+"""
+import json
+import time
+
+# Sin imports de Django a nivel de módulo: startup_profile importa este módulo
+# antes de ``django.setup()`` y los imports se le atribuirían a él.
+
+PLANTILLAS = [
+    "admin/index.html",
+    "admin/login.html",
+    "admin/change_list.html",
+    "admin/change_list_results.html",
+    "admin/change_form.html",
+    "admin/filter.html",
+    "admin/search_form.html",
+    "admin/pagination.html",
+    "admin/actions.html",
+    "admin/keyset_pagination.html",
+]
+
+
+def _sidebar():
+    from . import navegacion
+
+    navegacion.sidebar()
+
+
+def _plantilla(nombre):
+    """Compila la plantilla y las que extiende (quedan en el loader cacheado)."""
+    from django.template.loader import get_template
+    from django.template.loader_tags import ExtendsNode
+
+    while nombre:
+        plantilla = get_template(nombre).template
+        padre = next((n.parent_name.var for n in plantilla.nodelist if isinstance(n, ExtendsNode)), None)
+        nombre = padre if isinstance(padre, str) and padre != nombre else None
+
+
+def _plantillas():
+    from django.template import TemplateDoesNotExist
+
+    for nombre in PLANTILLAS:
+        try:
+            _plantilla(nombre)
+        except TemplateDoesNotExist:
+            pass
+
+
+def calentar(base=True):
+    """Devuelve ``{paso: segundos}``. ``base=False`` no toca la base (para el master de gunicorn)."""
+    from django.urls import get_resolver
+
+    from . import catalogos, cotizaciones
+
+    tiempos = {}
+
+    def paso(nombre, funcion):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos[nombre] = time.perf_counter() - inicio
+
+    paso("urls", lambda: get_resolver().reverse_dict)
+    paso("sidebar", _sidebar)
+    paso("plantillas", _plantillas)
+    if base:
+        paso("catalogos", catalogos.precargar)
+        paso("cotizaciones", cotizaciones.indice)
+    return tiempos
+
+
+# ====== Medición (la corre startup_profile en un proceso nuevo) ======
+def medir(inicio, url, host, usuario=None, calentado=False):
+    """Imprime en stdout un JSON con los tiempos de arranque de este proceso.
+
+    ``inicio`` es ``time.perf_counter()`` tomado antes de cualquier import.
+    """
+    import django
+
+    django.setup()
+    tiempos = {"setup": time.perf_counter() - inicio}
+
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from django.test import Client
+
+    if calentado:
+        tiempos["calentar"] = sum(calentar().values())
+    with transaction.atomic():
+        client = Client(HTTP_HOST=host)
+        if usuario:
+            client.force_login(get_user_model().objects.get(username=usuario))
+        for clave in ("primer_request", "segundo_request"):
+            inicio = time.perf_counter()
+            response = client.get(url)
+            tiempos[clave] = time.perf_counter() - inicio
+        tiempos["status"] = response.status_code
+        transaction.set_rollback(True)
+    print(json.dumps(tiempos))
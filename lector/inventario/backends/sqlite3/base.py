@@ -0,0 +1,34 @@
+"""SQLite para producción con varios workers.
+
+Igual al backend de Django más dos opciones en ``OPTIONS`` (se sacan antes de
+``sqlite3.connect``):
+
+- ``pragmas``: ``{nombre: valor}`` que se aplican a cada conexión nueva
+  (``journal_mode=WAL``, ``busy_timeout``, ``synchronous``, ``mmap_size``...).
+- ``transaction_mode``: ``"IMMEDIATE"`` abre los ``atomic()`` tomando el lock de
+  escritura de entrada. Con ``BEGIN`` a secas, una transacción que lee y después
+  escribe (p.ej. recalcular saldos) falla con "database is locked" sin esperar
+  el ``busy_timeout`` si otro worker escribió en el medio.
+
+Django 5.1 trae ``transaction_mode`` e ``init_command`` propios; con esa versión
+este backend se puede reemplazar por ``django.db.backends.sqlite3``.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop("pragmas", None)
+        kwargs.pop("transaction_mode", None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for nombre, valor in self.settings_dict["OPTIONS"].get("pragmas", {}).items():
+            conn.execute(f"PRAGMA {nombre} = {valor}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        modo = self.settings_dict["OPTIONS"].get("transaction_mode")
+        self.cursor().execute(f"BEGIN {modo}" if modo else "BEGIN")
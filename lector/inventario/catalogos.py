@@ -0,0 +1,110 @@
+"""Cache en memoria de los catálogos (estados, conceptos, situaciones, etc.).
+
+Cada worker guarda ``{pk: nombre}`` y un índice ordenado de prefijos por modelo.
+Al guardar o borrar una fila de cualquier catálogo se incrementa una versión
+compartida (``inventario.versiones``); los workers la consultan como mucho cada
+``INTERVALO_CHEQUEO`` segundos y, si cambió, vuelven a cargar desde la base.
+"""
+import bisect
+import time
+import unicodedata
+
+from django.db import transaction
+
+from . import models, replicas, versiones
+
+MODELOS = (
+    models.EstadoVencimiento,
+    models.Concepto,
+    models.Situacion,
+    models.Descripcion,
+    models.EstadoMoneda,
+    models.RetiroBuzon,
+    models.EntregadoA,
+)
+VERSION = "inventario.catalogos"
+INTERVALO_CHEQUEO = 2
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos, para buscar "situacion" y encontrar "Situación"."""
+    texto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+class Catalogo:
+    def __init__(self, filas):
+        self.nombres = dict(filas)
+        self.opciones = sorted(filas, key=lambda fila: normalizar(fila[1]))
+        # (prefijo buscable, pk): el nombre completo y cada palabra del nombre.
+        self.indice = sorted(
+            {(normalizar(parte), pk) for pk, nombre in filas for parte in [nombre, *nombre.split()]}
+        )
+
+    def buscar(self, texto):
+        """pks cuyos nombres tienen alguna palabra que empieza con cada palabra de ``texto``."""
+        resultado = None
+        for palabra in normalizar(texto).split():
+            encontrados = set()
+            i = bisect.bisect_left(self.indice, (palabra,))
+            while i < len(self.indice) and self.indice[i][0].startswith(palabra):
+                encontrados.add(self.indice[i][1])
+                i += 1
+            resultado = encontrados if resultado is None else resultado & encontrados
+        return resultado if resultado is not None else set(self.nombres)
+
+
+_catalogos = {}
+_estado = {"version": None, "chequeado": 0.0}
+
+
+def _vigentes():
+    ahora = time.monotonic()
+    if ahora - _estado["chequeado"] < INTERVALO_CHEQUEO:
+        return _catalogos
+    version = versiones.versiones(VERSION)[VERSION]
+    if version != _estado["version"]:
+        _catalogos.clear()
+        _estado["version"] = version
+    _estado["chequeado"] = ahora
+    return _catalogos
+
+
+def catalogo(model):
+    # Otro hilo puede vaciar el dict (``_limpiar``) en cualquier momento: se lee una vez y se
+    # devuelve la variable local.
+    catalogos = _vigentes()
+    resultado = catalogos.get(model)
+    if resultado is None:
+        with replicas.primaria():
+            resultado = Catalogo(list(model.objects.values_list("pk", "nombre")))
+        catalogos[model] = resultado
+    return resultado
+
+
+def nombre(model, pk):
+    return catalogo(model).nombres.get(pk, "") if pk is not None else ""
+
+
+def opciones(model):
+    """``[(pk, nombre)]`` ordenado por nombre, como ``Field.get_choices``."""
+    return catalogo(model).opciones
+
+
+def buscar(model, texto):
+    return catalogo(model).buscar(texto)
+
+
+def precargar():
+    for model in MODELOS:
+        catalogo(model)
+
+
+def _limpiar():
+    versiones.incrementar(VERSION)
+    _catalogos.clear()
+    _estado["chequeado"] = 0.0
+
+
+def invalidar():
+    transaction.on_commit(_limpiar)
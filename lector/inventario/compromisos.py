@@ -0,0 +1,123 @@
+"""Saldo por sobre de ``Compromiso`` y reporte de atrasos.
+
+El saldo de cada sobre es la suma corrida de ``importe`` en orden ``(fecha, id)``,
+particionada por ``asignacion``. Por defecto se calcula con una función de ventana
+al mostrar; con ``COMPROMISO_SALDO_INCREMENTAL`` se guarda en ``Compromiso.saldo``
+al grabar (``ledger`` con partición por sobre) y se lee directo de la columna.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery, Sum, Window
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from . import ledger
+from .models import AsignacionSobres, Compromiso
+
+
+def incremental():
+    return getattr(settings, "COMPROMISO_SALDO_INCREMENTAL", False)
+
+
+def saldo_por_sobre():
+    """Suma corrida de ``importe`` por sobre, para ``annotate``."""
+    return Window(
+        Sum("importe"),
+        partition_by=[F("asignacion_id")],
+        order_by=[F("fecha").asc(), F("pk").asc()],
+    )
+
+
+def completar_saldos(compromisos):
+    """Pone ``saldo_sobre`` en cada compromiso de la lista con una sola consulta.
+
+    La ventana se calcula sobre la historia completa de los sobres involucrados
+    (hasta la fecha más reciente de la lista), así el resultado no depende de los
+    filtros con que se armó la lista.
+    """
+    if not compromisos:
+        return
+    saldos = dict(
+        Compromiso.objects.filter(
+            asignacion_id__in={c.asignacion_id for c in compromisos},
+            fecha__lte=max(c.fecha for c in compromisos),
+        )
+        .annotate(saldo_sobre=saldo_por_sobre())
+        .values_list("pk", "saldo_sobre")
+    )
+    for compromiso in compromisos:
+        compromiso.saldo_sobre = saldos.get(compromiso.pk)
+
+
+def recalcular(asignacion_id, fecha, pk=0):
+    return ledger.recalcular_saldos(Compromiso, fecha, pk, particion=asignacion_id)
+
+
+def recalcular_todos():
+    """Recalcula ``Compromiso.saldo`` de todos los sobres; devuelve las filas actualizadas."""
+    actualizadas = 0
+    with transaction.atomic(using=Compromiso.objects.db):
+        for asignacion_id in AsignacionSobres.objects.values_list("pk", flat=True):
+            actualizadas += recalcular(asignacion_id, date.min)
+    return actualizadas
+
+
+# ====== Atrasos ======
+def _meses_entre(desde, hasta):
+    return (hasta.year - desde.year) * 12 + hasta.month - desde.month
+
+
+def _sobres():
+    ultimo = Compromiso.objects.filter(asignacion=OuterRef("pk")).order_by("-fecha", "-pk")
+    return (
+        AsignacionSobres.objects.order_by()
+        .annotate(
+            total=Sum("compromisos__importe"),
+            primero=Min("compromisos__fecha"),
+            ultimo=Max("compromisos__fecha"),
+            meses_con_aporte=Count(TruncMonth("compromisos__fecha"), distinct=True),
+            ultimo_importe=Subquery(ultimo.values("importe")[:1]),
+        )
+        .values_list("sobre_n", "hermano", "total", "primero", "ultimo", "meses_con_aporte", "ultimo_importe")
+    )
+
+
+def _atraso(fila, hoy):
+    sobre_n, hermano, total, primero, ultimo, meses_con_aporte, ultimo_importe = fila
+    meses_atraso = _meses_entre(ultimo, hoy) if ultimo else None
+    return {
+        "sobre_n": sobre_n,
+        "hermano": hermano,
+        "total": total or ledger.CERO,
+        "primero": primero,
+        "ultimo": ultimo,
+        "ultimo_importe": ultimo_importe,
+        "meses_con_aporte": meses_con_aporte,
+        "meses_sin_aporte": _meses_entre(primero, hoy) + 1 - meses_con_aporte if primero else None,
+        "meses_atraso": meses_atraso,
+        "atraso": (ultimo_importe or ledger.CERO) * (meses_atraso or 0),
+    }
+
+
+def _ordenar(filas):
+    filas.sort(key=lambda f: (f["ultimo"] is not None, -(f["meses_atraso"] or 0), f["sobre_n"]))
+    return filas
+
+
+def atrasos(hoy=None):
+    """Estado de aportes de los 50 sobres, con una sola consulta agrupada.
+
+    Por sobre: total aportado, primer y último aporte, meses con aporte, meses sin
+    aporte desde el primero, meses de atraso desde el último y el atraso estimado
+    (meses de atraso × último importe). Ordenado de mayor a menor atraso.
+    """
+    hoy = hoy or timezone.localdate()
+    return _ordenar([_atraso(fila, hoy) for fila in _sobres()])
+
+
+async def aatrasos(hoy=None):
+    """``atrasos`` con el ORM asíncrono (vistas ASGI)."""
+    hoy = hoy or timezone.localdate()
+    return _ordenar([_atraso(fila, hoy) async for fila in _sobres()])
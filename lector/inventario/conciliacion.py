@@ -0,0 +1,114 @@
+"""Controles de integridad de los saldos guardados.
+
+Cada control recorre su tabla una sola vez con ``.iterator()`` y devuelve los
+quiebres a medida que los encuentra (generadores), así la memoria no depende del
+tamaño de la historia.
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from . import compromisos, ledger
+from .models import Caja, MonedaExtranjera, OfrendaDonacion
+
+CHUNK_SIZE = 5000
+CENTAVO = Decimal("0.01")
+
+Quiebre = namedtuple("Quiebre", "model pk fecha esperado guardado")
+DiferenciaMensual = namedtuple("DiferenciaMensual", "anio mes ofrendas ingresos_caja")
+
+
+def libros():
+    """Libros con saldo corrido a controlar. ``Compromiso`` sólo si su saldo es derivado."""
+    for model, libro in ledger.LIBROS.items():
+        if libro.particion is None or compromisos.incremental():
+            yield model, libro
+
+
+def saldos(libro, contador=None):
+    """Filas cuyo saldo no es saldo anterior + movimientos (comparando contra el saldo guardado).
+
+    ``contador`` (una lista) recibe la cantidad de filas recorridas.
+    """
+    orden = ["fecha", "pk"] if libro.particion is None else [libro.particion, "fecha", "pk"]
+    particion = [libro.particion] if libro.particion else []
+    filas = (
+        libro.model.objects.order_by(*orden)
+        .values_list(*particion, "pk", "fecha", *libro.campos, libro.campo_saldo)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    actual = object()
+    anterior = ledger.CERO
+    n = 0
+    for fila in filas:
+        n += 1
+        if particion:
+            grupo, *fila = fila
+            if grupo != actual:
+                actual, anterior = grupo, ledger.CERO
+        pk, fecha, *valores, guardado = fila
+        esperado = anterior + libro.delta(valores)
+        if esperado != guardado:
+            yield Quiebre(libro.model, pk, fecha, esperado, guardado)
+        anterior = guardado
+    if contador is not None:
+        contador.append(n)
+
+
+def moneda_extranjera(contador=None):
+    """Filas cuyo ``saldo_ars`` no es la tenencia acumulada del código por su cotización.
+
+    La cotización es ``usd_revaluacion`` si la fila se revaluó, si no ``usd_hoy``.
+    """
+    filas = (
+        MonedaExtranjera.objects.order_by("codigo", "fecha", "pk")
+        .values_list(
+            "codigo", "pk", "fecha", "ingreso", "compra_usd", "egreso_usd", "usd_hoy", "usd_revaluacion", "saldo_ars"
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    codigo_actual = None
+    tenencia = Decimal("0")
+    n = 0
+    for codigo, pk, fecha, ingreso, compra, egreso, usd_hoy, revaluacion, saldo_ars in filas:
+        n += 1
+        if codigo != codigo_actual:
+            codigo_actual, tenencia = codigo, Decimal("0")
+        tenencia += ingreso + compra - egreso
+        esperado = (tenencia * (usd_hoy if revaluacion is None else revaluacion)).quantize(CENTAVO)
+        if abs(esperado - saldo_ars) > CENTAVO:
+            yield Quiebre(MonedaExtranjera, pk, fecha, esperado, saldo_ars)
+    if contador is not None:
+        contador.append(n)
+
+
+def _por_mes(queryset, campo):
+    return (
+        queryset.order_by()
+        .annotate(anio=ExtractYear("fecha"), mes=ExtractMonth("fecha"))
+        .values("anio", "mes")
+        .annotate(total=Sum(campo))
+        .order_by("anio", "mes")
+        .values_list("anio", "mes", "total")
+    )
+
+
+def ofrendas_vs_caja(tolerancia=CENTAVO):
+    """Meses en que lo recibido en ofrendas supera los ingresos registrados en Caja.
+
+    Dos consultas agrupadas por mes (a lo sumo 12 filas por año cada una) que se
+    recorren juntas como un merge de listas ordenadas.
+    """
+    ofrendas = iter(_por_mes(OfrendaDonacion.objects, "importe"))
+    ingresos = iter(_por_mes(Caja.objects, "ingreso"))
+    o, c = next(ofrendas, None), next(ingresos, None)
+    while o is not None:
+        if c is not None and c[:2] < o[:2]:
+            c = next(ingresos, None)
+            continue
+        ingreso = c[2] if c is not None and c[:2] == o[:2] else ledger.CERO
+        if o[2] - ingreso > tolerancia:
+            yield DiferenciaMensual(o[0], o[1], o[2], ingreso)
+        o = next(ofrendas, None)
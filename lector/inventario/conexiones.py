@@ -0,0 +1,69 @@
+"""Métricas de conexiones a la base, por proceso.
+
+Con ``CONN_MAX_AGE`` cada hilo de un worker conserva su conexión (y con ella la
+sesión TLS ya negociada) entre requests; ``CONN_HEALTH_CHECKS`` la prueba antes de
+reutilizarla. Django no tiene pool propio: cada hilo es un "pool" de una conexión.
+
+Los contadores son del proceso que atiende el pedido (cada worker de gunicorn
+tiene los suyos) y se reinician cuando gunicorn recicla el worker.
+"""
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+_lock = threading.Lock()
+_contadores = Counter()
+_inicio = time.monotonic()
+
+
+def _sumar(clave):
+    with _lock:
+        _contadores[clave] += 1
+
+
+def _abiertas():
+    return [c for c in connections.all(initialized_only=True) if c.connection is not None]
+
+
+def conexion_creada(alias):
+    _sumar((alias, "creadas"))
+
+
+def request_iniciado():
+    """Después de ``close_old_connections``: las que siguen abiertas se reutilizan."""
+    _sumar((None, "requests"))
+    for conexion in _abiertas():
+        _sumar((conexion.alias, "reutilizadas"))
+
+
+def metricas():
+    """``{"pid", "uptime", "requests", "bases": {alias: {...}}}`` del proceso actual."""
+    with _lock:
+        contadores = dict(_contadores)
+    bases = {}
+    for alias in settings.DATABASES:
+        conexion = connections[alias]
+        bases[alias] = {
+            "vendor": conexion.vendor,
+            "conn_max_age": conexion.settings_dict.get("CONN_MAX_AGE"),
+            "health_checks": conexion.settings_dict.get("CONN_HEALTH_CHECKS"),
+            "creadas": contadores.get((alias, "creadas"), 0),
+            "reutilizadas": contadores.get((alias, "reutilizadas"), 0),
+            "abierta": conexion.connection is not None,
+        }
+    return {
+        "pid": os.getpid(),
+        "uptime": round(time.monotonic() - _inicio),
+        "requests": contadores.get((None, "requests"), 0),
+        "bases": bases,
+    }
+
+
+def cerrar_todas():
+    """Cierra las conexiones del hilo actual (al reciclar o bajar un worker)."""
+    for conexion in _abiertas():
+        conexion.close()
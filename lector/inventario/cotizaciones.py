@@ -0,0 +1,120 @@
+"""Historia de cotizaciones con búsqueda "a tal fecha" en memoria.
+
+Cada worker carga una vez ``{codigo: (fechas ordenadas, valores)}`` y responde la
+cotización vigente a cualquier fecha con ``bisect``. Igual que ``catalogos``, una
+versión compartida (``inventario.versiones``) avisa a los demás workers que recarguen.
+"""
+import bisect
+import time
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import replicas, versiones
+from .models import Cotizacion, MonedaExtranjera
+from .upsert import upsert
+
+VERSION = "inventario.cotizaciones"
+INTERVALO_CHEQUEO = 2
+BATCH_SIZE = 1000
+CENTAVO = Decimal("0.01")
+
+
+class Indice:
+    def __init__(self, filas):
+        self.series = {}
+        for codigo, fecha, valor in filas:
+            fechas, valores = self.series.setdefault(codigo, ([], []))
+            fechas.append(fecha)
+            valores.append(valor)
+
+    def al(self, codigo, fecha):
+        """Última cotización de ``codigo`` con fecha <= ``fecha``; ``None`` si no hay."""
+        serie = self.series.get(codigo)
+        if serie is None:
+            return None
+        i = bisect.bisect_right(serie[0], fecha)
+        return serie[1][i - 1] if i else None
+
+
+_estado = {"indice": None, "version": None, "chequeado": 0.0}
+
+
+def indice():
+    ahora = time.monotonic()
+    if _estado["indice"] is not None and ahora - _estado["chequeado"] < INTERVALO_CHEQUEO:
+        return _estado["indice"]
+    version = versiones.versiones(VERSION)[VERSION]
+    if _estado["indice"] is None or version != _estado["version"]:
+        with replicas.primaria():
+            filas = Cotizacion.objects.order_by("codigo", "fecha").values_list("codigo", "fecha", "valor")
+            _estado["indice"] = Indice(filas)
+        _estado["version"] = version
+    _estado["chequeado"] = ahora
+    return _estado["indice"]
+
+
+def cotizacion(codigo, fecha):
+    return indice().al(codigo, fecha)
+
+
+def _limpiar():
+    versiones.incrementar(VERSION)
+    _estado["indice"] = None
+
+
+def invalidar():
+    transaction.on_commit(_limpiar)
+
+
+# ====== Carga ======
+def cargar(filas):
+    """Inserta o actualiza ``(codigo, fecha, valor)`` con un upsert por lotes; devuelve cuántas filas."""
+    ahora = timezone.now()
+    # Si se repite (codigo, fecha) gana la última.
+    cotizaciones = {
+        (codigo, fecha): Cotizacion(codigo=codigo, fecha=fecha, valor=valor, created_at=ahora, updated_at=ahora)
+        for codigo, fecha, valor in filas
+    }
+    with transaction.atomic(using=Cotizacion.objects.db):
+        upsert(
+            Cotizacion,
+            list(cotizaciones.values()),
+            unique_fields=["codigo", "fecha"],
+            update_fields=["valor", "updated_at"],
+            batch_size=BATCH_SIZE,
+        )
+        invalidar()
+    return len(cotizaciones)
+
+
+# ====== Revaluación ======
+def revaluar(fecha, queryset=None):
+    """Valúa cada fila de ``MonedaExtranjera`` a la cotización vigente en ``fecha``.
+
+    ``saldo_ars`` pasa a ser la tenencia acumulada del código hasta la fila
+    (ingreso + compra - egreso) por esa cotización, que se guarda en ``usd_revaluacion``.
+    ``usd_hoy`` no se toca: es la cotización del día del movimiento y ``valuacion`` la
+    usa como costo. Una lectura y un ``bulk_update``. Devuelve ``(filas actualizadas, códigos sin cotización)``.
+    """
+    queryset = MonedaExtranjera.objects.all() if queryset is None else queryset
+    tabla = indice()
+    tenencias = {}
+    sin_cotizacion = set()
+    cambios = []
+    filas = queryset.order_by("codigo", "fecha", "pk").values_list(
+        "pk", "codigo", "ingreso", "compra_usd", "egreso_usd", "usd_revaluacion", "saldo_ars"
+    )
+    with transaction.atomic(using=MonedaExtranjera.objects.db):
+        for pk, codigo, ingreso, compra, egreso, revaluacion, saldo_ars in filas:
+            tenencia = tenencias[codigo] = tenencias.get(codigo, 0) + ingreso + compra - egreso
+            valor = tabla.al(codigo, fecha)
+            if valor is None:
+                sin_cotizacion.add(codigo)
+                continue
+            nuevo = (tenencia * valor).quantize(CENTAVO)
+            if revaluacion != valor or saldo_ars != nuevo:
+                cambios.append(MonedaExtranjera(pk=pk, usd_revaluacion=valor, saldo_ars=nuevo))
+        MonedaExtranjera.objects.bulk_update(cambios, ["usd_revaluacion", "saldo_ars"], batch_size=BATCH_SIZE)
+    return len(cambios), sorted(sin_cotizacion)
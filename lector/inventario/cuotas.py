@@ -0,0 +1,80 @@
+"""Grilla anual de cuotas INAC: hermano × 12 meses.
+
+Cada hermano se resume en una máscara de 12 bits (bit 0 = enero) armada con una
+sola consulta agregada; la unicidad ``(hermano, mes, anio)`` garantiza que sumar
+los bits equivale a un OR. El resultado se cachea por año y versión de ``CuotaInac``.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, IntegerField, Sum, When
+from django.utils import timezone
+
+from . import replicas, versiones
+from .models import CuotaInac
+
+TIMEOUT = 60 * 60 * 24
+MESES = list(range(1, 13))
+COMPLETA = (1 << 12) - 1
+
+
+def bit(mes):
+    return 1 << (mes - 1)
+
+
+def pagados(mascara):
+    return [mes for mes in MESES if mascara & bit(mes)]
+
+
+def _version():
+    nombre = versiones.nombre_de(CuotaInac)
+    return versiones.versiones(nombre)[nombre]
+
+
+def matriz(anio):
+    """``{hermano: máscara}`` del año, ordenado por hermano.
+
+    Incluye a quienes pagaron algo el año anterior, con máscara 0 si este año no pagaron nada.
+    """
+    clave = f"cuotas:matriz:{anio}:{_version()}"
+    resultado = cache.get(clave)
+    if resultado is None:
+        mascara = Sum(
+            Case(*[When(anio=anio, mes=mes, then=bit(mes)) for mes in MESES], default=0, output_field=IntegerField())
+        )
+        filas = (
+            CuotaInac.objects.filter(anio__in=[anio - 1, anio])
+            .order_by("hermano")
+            .values("hermano")
+            .annotate(mascara=mascara)
+            .values_list("hermano", "mascara")
+        )
+        with replicas.primaria():
+            resultado = dict(filas)
+        cache.set(clave, resultado, TIMEOUT)
+    return resultado
+
+
+def marcar_pagas(celdas):
+    """Registra como pagas las celdas ``(hermano, anio, mes)``; devuelve cuántas se agregaron.
+
+    Las que ya existían se ignoran y no se cuentan.
+    """
+    celdas = set(celdas)
+    if not celdas:
+        return 0
+    ahora = timezone.now()
+    with transaction.atomic(using=CuotaInac.objects.db):
+        existentes = set(
+            CuotaInac.objects.filter(
+                hermano__in={hermano for hermano, _, _ in celdas}, anio__in={anio for _, anio, _ in celdas}
+            ).values_list("hermano", "anio", "mes")
+        )
+        cuotas = [
+            CuotaInac(hermano=hermano, anio=anio, mes=mes, created_at=ahora, updated_at=ahora)
+            for hermano, anio, mes in celdas - existentes
+        ]
+        # ignore_conflicts por si otro request marcó la misma celda mientras tanto.
+        CuotaInac.objects.bulk_create(cuotas, ignore_conflicts=True)
+        # bulk_create no dispara señales.
+        versiones.incrementar_al_confirmar(versiones.nombre_de(CuotaInac))
+    return len(cuotas)
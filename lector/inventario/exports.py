@@ -0,0 +1,258 @@
+"""Exportación en streaming (CSV / XLSX) de los changelists del admin.
+
+Las filas se leen con ``.iterator(chunk_size=...)`` y se escriben a medida que
+llegan, así la memoria no crece con el tamaño del año exportado. Servido por ASGI
+se usa ``.aiterator()``: el worker no queda tomado mientras el cliente descarga.
+Los valores se leen en el event loop, así que todo lo que use ``export_fields``
+tiene que venir en ``select_related``.
+"""
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.contrib.admin.utils import label_for_field
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.text import capfirst
+
+CHUNK_SIZE = 2000
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class _Buffer:
+    """Archivo de sólo escritura: acumula lo escrito hasta que se lo vacía."""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, data):
+        self.partes.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        data = type(self.partes[0])().join(self.partes) if self.partes else b""
+        self.partes = []
+        return data
+
+
+def _valor(obj, campo):
+    valor = getattr(obj, campo)
+    if callable(valor):
+        valor = valor()
+    if valor is None:
+        return ""
+    if isinstance(valor, (str, int, Decimal, date)):
+        return valor
+    return str(valor)
+
+
+def _encabezados(model, campos, model_admin):
+    return [capfirst(str(label_for_field(campo, model, model_admin))) for campo in campos]
+
+
+def _bloques(queryset, campos, chunk_size):
+    """Filas de a ``chunk_size``."""
+    bloque = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        bloque.append([_valor(obj, campo) for campo in campos])
+        if len(bloque) == chunk_size:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+async def _abloques(queryset, campos, chunk_size):
+    bloque = []
+    async for obj in queryset.aiterator(chunk_size=chunk_size):
+        bloque.append([_valor(obj, campo) for campo in campos])
+        if len(bloque) == chunk_size:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def _generar(escritor, bloques):
+    yield escritor.inicio()
+    for bloque in bloques:
+        yield escritor.bloque(bloque)
+    yield escritor.fin()
+
+
+async def _agenerar(escritor, bloques):
+    yield escritor.inicio()
+    async for bloque in bloques:
+        yield escritor.bloque(bloque)
+    yield escritor.fin()
+
+
+# ====== CSV ======
+# Texto que Excel o LibreOffice tomarían como fórmula al abrir el CSV.
+INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _celda_csv(valor):
+    """Antepone ``'`` al texto que empieza como una fórmula; los números quedan como están."""
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+class _Csv:
+    def __init__(self, encabezados):
+        self.encabezados = encabezados
+        self.buffer = _Buffer()
+        self.writer = csv.writer(self.buffer)
+
+    def inicio(self):
+        self.buffer.write("\ufeff")  # BOM para que Excel detecte UTF-8
+        self.writer.writerow(self.encabezados)
+        return self.buffer.vaciar()
+
+    def bloque(self, filas):
+        self.writer.writerows([_celda_csv(valor) for valor in fila] for fila in filas)
+        return self.buffer.vaciar()
+
+    def fin(self):
+        return self.buffer.vaciar()
+
+
+# ====== XLSX ======
+_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_CONTENT_TYPES = (
+    _XML + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+_RELS = (
+    _XML + f'<Relationships xmlns="{_NS_PKG}">'
+    f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK = (
+    _XML + f'<workbook xmlns="{_NS}" xmlns:r="{_NS_REL}">'
+    '<sheets><sheet name="Datos" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    _XML + f'<Relationships xmlns="{_NS_PKG}">'
+    f'<Relationship Id="rId1" Type="{_NS_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+    f'<Relationship Id="rId2" Type="{_NS_REL}/styles" Target="styles.xml"/>'
+    "</Relationships>"
+)
+# Estilo 1 = fecha (formato 14 de Excel).
+_STYLES = (
+    _XML + f'<styleSheet xmlns="{_NS}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+_EPOCH_EXCEL = date(1899, 12, 30)
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _celda(valor):
+    if isinstance(valor, datetime):
+        valor = timezone.localtime(valor) if timezone.is_aware(valor) else valor
+        valor = valor.date()
+    if isinstance(valor, date):
+        return f'<c s="1"><v>{(valor - _EPOCH_EXCEL).days}</v></c>'
+    if isinstance(valor, (int, Decimal)) and not isinstance(valor, bool):
+        return f"<c><v>{valor}</v></c>"
+    texto = escape(_CONTROL.sub("", str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _fila_xml(fila):
+    return ("<row>" + "".join(_celda(valor) for valor in fila) + "</row>").encode()
+
+
+class _Xlsx:
+    def __init__(self, encabezados):
+        self.encabezados = encabezados
+        self.buffer = _Buffer()
+
+    def inicio(self):
+        # Sin ``tell``/``seek`` zipfile escribe en modo streaming (descriptores de datos al final).
+        self.libro = zipfile.ZipFile(self.buffer, "w", compression=zipfile.ZIP_DEFLATED)
+        self.libro.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self.libro.writestr("_rels/.rels", _RELS)
+        self.libro.writestr("xl/workbook.xml", _WORKBOOK)
+        self.libro.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        self.libro.writestr("xl/styles.xml", _STYLES)
+        self.hoja = self.libro.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self.hoja.write(f'{_XML}<worksheet xmlns="{_NS}"><sheetData>'.encode())
+        self.hoja.write(_fila_xml(self.encabezados))
+        return self.buffer.vaciar()
+
+    def bloque(self, filas):
+        for fila in filas:
+            self.hoja.write(_fila_xml(fila))
+        return self.buffer.vaciar()
+
+    def fin(self):
+        self.hoja.write(b"</sheetData></worksheet>")
+        self.hoja.close()
+        self.libro.close()
+        return self.buffer.vaciar()
+
+
+ESCRITORES = {"csv": _Csv, "xlsx": _Xlsx}
+
+
+def es_asgi(request):
+    return isinstance(request, ASGIRequest)
+
+
+def respuesta(
+    queryset, campos, formato, model_admin=None, select_related=(), chunk_size=CHUNK_SIZE, asincrono=False
+):
+    """``StreamingHttpResponse`` con ``queryset`` exportado en ``formato`` (``csv`` o ``xlsx``).
+
+    ``asincrono`` (servido por ASGI, ver ``es_asgi``) devuelve un iterador asíncrono;
+    con WSGI tiene que ser sincrónico o Django junta todo en memoria antes de enviar.
+    """
+    if formato not in ESCRITORES:
+        raise Http404(f"Formato de exportación desconocido: {formato}")
+    model = queryset.model
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    # Se fija la base ahora (réplica o primaria): el iterador se consume después de que la vista ya devolvió.
+    queryset = queryset.using(queryset.db)
+    escritor = ESCRITORES[formato](_encabezados(model, campos, model_admin))
+    if asincrono:
+        contenido = _agenerar(escritor, _abloques(queryset, campos, chunk_size))
+    else:
+        contenido = _generar(escritor, _bloques(queryset, campos, chunk_size))
+    response = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+    nombre = f"{model._meta.model_name}-{timezone.localdate():%Y%m%d}.{formato}"
+    response["Content-Disposition"] = f'attachment; filename="{nombre}"'
+    response["X-Accel-Buffering"] = "no"
+    return response
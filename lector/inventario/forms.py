@@ -0,0 +1,29 @@
+from django import forms
+
+from . import models
+
+
+# ====== Movimientos cargados sin conexión (ver ``inventario.sincronizacion``) ======
+# Mismos campos que el alta del admin; el saldo lo calcula el servidor.
+class CajaForm(forms.ModelForm):
+    class Meta:
+        model = models.Caja
+        fields = ["fecha", "descripcion", "ingreso", "egreso"]
+
+
+class OfrendaDonacionForm(forms.ModelForm):
+    class Meta:
+        model = models.OfrendaDonacion
+        fields = ["fecha", "retiro_buzon", "entregado_a", "importe", "concepto"]
+
+
+# ====== Grilla de cuotas (``CuotaInacAdmin.matriz_view``) ======
+_CUOTA = models.CuotaInac._meta
+
+
+class CuotaCeldaForm(forms.Form):
+    """Una celda tildada. Sin las restricciones de unicidad: las cuotas ya pagas se ignoran."""
+
+    hermano = forms.CharField(max_length=_CUOTA.get_field("hermano").max_length)
+    anio = forms.IntegerField(validators=_CUOTA.get_field("anio").validators)
+    mes = forms.TypedChoiceField(choices=_CUOTA.get_field("mes").choices, coerce=int)
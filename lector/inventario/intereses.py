@@ -0,0 +1,190 @@
+"""Devengamiento de intereses de la cuenta MP.
+
+Con un cronograma de tasas (TNA vigente desde cada fecha) recorre los días de un
+rango sobre el saldo de cierre diario y acredita el interés al final de cada mes
+(o en ``hasta`` si el rango termina a mitad de mes). Todo se calcula en centavos
+enteros; sólo se redondea una vez por día (capitalización diaria) o una vez por
+mes (capitalización mensual).
+
+Dos formas de escribir el resultado:
+
+- ``filas``: agrega una fila de MP por mes con sólo ``ganancia`` (fecha = fin del
+  período). Una fila así cubre el mes hasta su fecha: esos días se respetan y sólo
+  se acredita el resto del mes (p.ej. al volver a correr un mes cortado a la mitad).
+- ``ganancia``: reescribe ``ganancia`` de las filas existentes del rango; el interés
+  del mes va en la última fila del mes y el resto queda en cero.
+
+En ambos casos los saldos se recalculan después en una sola pasada (``ledger``).
+"""
+import bisect
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from . import ledger, rollups, versiones
+from .models import MP
+
+DIARIA = "diaria"
+MENSUAL = "mensual"
+CAPITALIZACIONES = [DIARIA, MENSUAL]
+
+FILAS = "filas"
+GANANCIA = "ganancia"
+MODOS = [FILAS, GANANCIA]
+
+# Las tasas se guardan como enteros en diezmilésimos de punto porcentual (97,5 % -> 975000).
+ESCALA_TASA = 10000
+DIVISOR_DIARIO = 365 * 100 * ESCALA_TASA
+
+
+def centavos(valor):
+    return int(Decimal(valor).scaleb(2).to_integral_value())
+
+
+def pesos(centavos):
+    return Decimal(centavos).scaleb(-2)
+
+
+def _dividir(numerador, divisor):
+    """División entera con redondeo bancario (igual que ``Decimal`` por defecto)."""
+    cociente, resto = divmod(numerador, divisor)
+    if resto * 2 > divisor or (resto * 2 == divisor and cociente % 2):
+        cociente += 1
+    return cociente
+
+
+class Tasas:
+    """Cronograma de TNA: ``[(vigente_desde, tasa_en_porcentaje)]``."""
+
+    def __init__(self, cronograma):
+        if not cronograma:
+            raise ValueError("El cronograma de tasas está vacío.")
+        ordenado = sorted((fecha, int((Decimal(tasa) * ESCALA_TASA).to_integral_value())) for fecha, tasa in cronograma)
+        self.fechas = [fecha for fecha, _ in ordenado]
+        self.tasas = [tasa for _, tasa in ordenado]
+
+    def vigente(self, fecha):
+        i = bisect.bisect_right(self.fechas, fecha) - 1
+        if i < 0:
+            raise ValueError(f"No hay tasa vigente para {fecha:%d/%m/%Y}.")
+        return self.tasas[i]
+
+
+def periodos(desde, hasta):
+    """Meses calendario entre ``desde`` y ``hasta`` como ``(inicio, fin)``, recortados al rango."""
+    inicio = desde
+    while inicio <= hasta:
+        ultimo = calendar.monthrange(inicio.year, inicio.month)[1]
+        fin = min(date(inicio.year, inicio.month, ultimo), hasta)
+        yield inicio, fin
+        inicio = fin + timedelta(days=1)
+
+
+class Acreditacion:
+    """Interés de un período y la fila de MP donde se escribe."""
+
+    def __init__(self, inicio, fin, centavos, fila_pk=None, existente=False):
+        self.inicio = inicio
+        self.fin = fin
+        self.centavos = centavos
+        self.fila_pk = fila_pk
+        self.existente = existente
+
+    @property
+    def interes(self):
+        return pesos(self.centavos)
+
+
+def _es_fila_de_interes(ingreso, egreso, ganancia):
+    return not ingreso and not egreso and ganancia
+
+
+def calcular(desde, hasta, tasas, capitalizacion=MENSUAL, modo=FILAS):
+    """Devuelve las ``Acreditacion`` de cada mes del rango, sin escribir nada.
+
+    Hace una sola consulta por las filas del rango y recorre los días en memoria.
+    """
+    if capitalizacion not in CAPITALIZACIONES:
+        raise ValueError(f"Capitalización desconocida: {capitalizacion}")
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconocido: {modo}")
+
+    saldo = centavos(ledger.saldo_anterior(MP, desde - timedelta(days=1)))
+    filas = (
+        MP.objects.filter(fecha__range=(desde, hasta))
+        .order_by("fecha", "pk")
+        .values_list("pk", "fecha", "ingreso", "egreso", "ganancia")
+    )
+    netos = defaultdict(int)
+    ultima_del_mes = {}
+    acreditado_hasta = {}
+    for pk, fecha, ingreso, egreso, ganancia in filas:
+        netos[fecha] += centavos(ingreso) - centavos(egreso)
+        ultima_del_mes[(fecha.year, fecha.month)] = pk
+        if modo == FILAS:
+            # La ganancia ya cargada es parte del saldo; en modo ``ganancia`` se reemplaza.
+            netos[fecha] += centavos(ganancia)
+            if _es_fila_de_interes(ingreso, egreso, ganancia):
+                acreditado_hasta[(fecha.year, fecha.month)] = fecha
+
+    acreditaciones = []
+    for inicio, fin in periodos(desde, hasta):
+        mes = (inicio.year, inicio.month)
+        # Los días hasta la última fila de interés del mes ya están acreditados.
+        cubierto = acreditado_hasta.get(mes)
+        existente = cubierto == fin
+        primero = cubierto + timedelta(days=1) if cubierto else inicio
+        interes = acumulado = 0
+        dia = inicio
+        while dia <= fin:
+            saldo += netos.get(dia, 0)
+            if dia >= primero:
+                devengado = max(saldo, 0) * tasas.vigente(dia)
+                if capitalizacion == DIARIA:
+                    diario = _dividir(devengado, DIVISOR_DIARIO)
+                    saldo += diario
+                    interes += diario
+                else:
+                    acumulado += devengado
+            dia += timedelta(days=1)
+        if capitalizacion == MENSUAL and not existente:
+            interes = _dividir(acumulado, DIVISOR_DIARIO)
+            saldo += interes
+        acreditaciones.append(
+            Acreditacion(
+                inicio if existente else primero, fin, interes, fila_pk=ultima_del_mes.get(mes), existente=existente
+            )
+        )
+    return acreditaciones
+
+
+def devengar(desde, hasta, tasas, capitalizacion=MENSUAL, modo=FILAS):
+    """Calcula y escribe los intereses del rango; devuelve las ``Acreditacion``."""
+    with transaction.atomic(using=MP.objects.db):
+        acreditaciones = calcular(desde, hasta, tasas, capitalizacion, modo)
+        nuevas = []
+        if modo == FILAS:
+            nuevas = [MP(fecha=a.fin, ganancia=a.interes) for a in acreditaciones if a.centavos and not a.existente]
+        else:
+            destino = {a.fila_pk: a.interes for a in acreditaciones if a.fila_pk is not None}
+            cambios = []
+            for obj in MP.objects.filter(fecha__range=(desde, hasta)).only("pk", "ganancia"):
+                ganancia = destino.get(obj.pk, ledger.CERO)
+                if obj.ganancia != ganancia:
+                    obj.ganancia = ganancia
+                    cambios.append(obj)
+            MP.objects.bulk_update(cambios, ["ganancia"], batch_size=ledger.BATCH_SIZE)
+            # Meses con interés pero sin movimientos: se agrega la fila.
+            nuevas = [MP(fecha=a.fin, ganancia=a.interes) for a in acreditaciones if a.centavos and a.fila_pk is None]
+        for obj in nuevas:
+            obj.saldo = ledger.CERO  # lo completa recalcular_saldos
+        MP.objects.bulk_create(nuevas, batch_size=ledger.BATCH_SIZE)
+
+        # bulk_create / bulk_update no disparan señales.
+        ledger.recalcular_saldos(MP, desde)
+        rollups.reconstruir_desde(MP, desde)
+        versiones.incrementar_al_confirmar(versiones.nombre_de(MP))
+    return acreditaciones
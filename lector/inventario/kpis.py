@@ -0,0 +1,73 @@
+"""Indicadores del dashboard del admin, cacheados e invalidados por versión de modelo."""
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from . import models, replicas, versiones
+from .models import ResumenDiario
+
+TIMEOUT = 60 * 60 * 24
+ESTADO_PAGADA = "Pagada"
+
+
+def saldo_caja():
+    return models.Caja.objects.order_by("-fecha", "-id").values_list("saldo", flat=True).first()
+
+
+def saldo_mp():
+    return models.MP.objects.order_by("-fecha", "-id").values_list("saldo", flat=True).first()
+
+
+def vencimientos_pendientes():
+    return models.Vencimiento.objects.exclude(estado__nombre=ESTADO_PAGADA).aggregate(
+        cantidad=Count("pk"), importe=Sum("importe")
+    )
+
+
+def ofrendas_mes(hoy):
+    """Suma del mes leída de los resúmenes diarios (a lo sumo 31 filas)."""
+    return ResumenDiario.objects.filter(
+        libro=ResumenDiario.Libro.OFRENDAS, anio=hoy.year, mes=hoy.month
+    ).aggregate(importe=Sum("importe"), movimientos=Sum("movimientos"))
+
+
+# nombre -> (modelos de los que depende, función, depende del mes en curso)
+KPIS = {
+    "saldo_caja": ((models.Caja,), saldo_caja, False),
+    "saldo_mp": ((models.MP,), saldo_mp, False),
+    "vencimientos_pendientes": ((models.Vencimiento,), vencimientos_pendientes, False),
+    "ofrendas_mes": ((models.OfrendaDonacion,), ofrendas_mes, True),
+}
+MODELOS = {model for deps, _, _ in KPIS.values() for model in deps}
+
+
+def obtener(*nombres):
+    """Devuelve ``{nombre: valor}``; sólo recalcula los indicadores cuya versión cambió."""
+    nombres = nombres or tuple(KPIS)
+    hoy = timezone.localdate()
+    vers = versiones.versiones(*{versiones.nombre_de(m) for n in nombres for m in KPIS[n][0]})
+
+    claves = {}
+    for nombre in nombres:
+        deps, _, mensual = KPIS[nombre]
+        partes = [str(vers[versiones.nombre_de(m)]) for m in deps]
+        if mensual:
+            partes.append(hoy.strftime("%Y-%m"))
+        claves[f"kpi:{nombre}:{':'.join(partes)}"] = nombre
+
+    cacheados = cache.get_many(list(claves))
+    nuevos = {}
+    with replicas.primaria():
+        for clave, nombre in claves.items():
+            if clave not in cacheados:
+                _, funcion, mensual = KPIS[nombre]
+                nuevos[clave] = funcion(hoy) if mensual else funcion()
+    if nuevos:
+        cache.set_many(nuevos, TIMEOUT)
+    return {nombre: {**cacheados, **nuevos}[clave] for clave, nombre in claves.items()}
+
+
+def dashboard_callback(request, context):
+    """``UNFOLD["DASHBOARD_CALLBACK"]``: agrega los indicadores al contexto del index."""
+    context.update(obtener())
+    return context
@@ -0,0 +1,114 @@
+"""Motor de saldos corridos para los libros que guardan una columna ``saldo``."""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import Signal
+
+from . import models
+
+BATCH_SIZE = 1000
+CERO = Decimal("0.00")
+
+# Se envía con ``cierres={fecha: saldo de la última fila del día}`` para los días recorridos.
+saldos_recalculados = Signal()
+
+
+class Libro:
+    """Describe cómo se acumula el saldo de un modelo.
+
+    saldo = saldo anterior + suma de los campos ``suma`` - suma de los campos ``resta``,
+    recorriendo las filas en orden ``(fecha, id)``. Con ``particion`` cada valor de ese
+    campo lleva su propio saldo (p.ej. un saldo por sobre en ``Compromiso``).
+    """
+
+    def __init__(self, model, suma=(), resta=(), campo_saldo="saldo", particion=None):
+        self.model = model
+        self.suma = tuple(suma)
+        self.resta = tuple(resta)
+        self.campo_saldo = campo_saldo
+        self.particion = particion
+
+    @property
+    def campos(self):
+        return self.suma + self.resta
+
+    def delta(self, valores):
+        """``valores`` sigue el orden de ``campos``."""
+        n = len(self.suma)
+        return sum(valores[:n], CERO) - sum(valores[n:], CERO)
+
+
+LIBROS = {
+    models.Caja: Libro(models.Caja, suma=["ingreso"], resta=["egreso"]),
+    models.MP: Libro(models.MP, suma=["ingreso", "ganancia"], resta=["egreso"]),
+    models.OfrendaDonacion: Libro(models.OfrendaDonacion, suma=["importe"]),
+    models.Compromiso: Libro(models.Compromiso, suma=["importe"], particion="asignacion_id"),
+}
+
+
+def _desde(fecha, pk):
+    """Filas en la posición ``(fecha, pk)`` o posteriores."""
+    return Q(fecha__gt=fecha) | Q(fecha=fecha, pk__gte=pk)
+
+
+def _antes(fecha, pk):
+    return Q(fecha__lt=fecha) | Q(fecha=fecha, pk__lt=pk)
+
+
+def _filas(libro, particion):
+    if libro.particion is None:
+        return libro.model.objects.all()
+    if particion is None:
+        raise ValueError(f"{libro.model.__name__} lleva un saldo por {libro.particion}: falta la partición.")
+    return libro.model.objects.filter(**{libro.particion: particion})
+
+
+def saldo_anterior(model, fecha, pk=None, particion=None):
+    """Saldo de la última fila estrictamente anterior a ``(fecha, pk)``.
+
+    Sin ``pk`` incluye todas las filas de ``fecha`` (posición de una fila nueva en ese día).
+    """
+    libro = LIBROS[model]
+    saldo = (
+        _filas(libro, particion)
+        .filter(Q(fecha__lte=fecha) if pk is None else _antes(fecha, pk))
+        .order_by("-fecha", "-pk")
+        .values_list(libro.campo_saldo, flat=True)
+        .first()
+    )
+    return CERO if saldo is None else saldo
+
+
+def recalcular_saldos(model, fecha, pk=0, batch_size=BATCH_SIZE, particion=None):
+    """Recalcula el saldo de las filas desde ``(fecha, pk)`` en adelante.
+
+    Hace una sola pasada ordenada sobre las filas afectadas y escribe con
+    ``bulk_update`` por lotes sólo las que cambiaron. Devuelve cuántas filas se actualizaron.
+    """
+    libro = LIBROS[model]
+    with transaction.atomic(using=model.objects.db):
+        saldo = saldo_anterior(model, fecha, pk, particion)
+        filas = (
+            _filas(libro, particion)
+            .filter(_desde(fecha, pk))
+            .order_by("fecha", "pk")
+            .values_list("pk", "fecha", *libro.campos, libro.campo_saldo)
+            .iterator(chunk_size=batch_size)
+        )
+        cambios = []
+        cierres = {}
+        for fila_pk, fila_fecha, *valores, actual in filas:
+            saldo = saldo + libro.delta(valores)
+            cierres[fila_fecha] = saldo
+            if actual != saldo:
+                cambios.append((fila_pk, saldo))
+
+        # Se escribe al terminar de leer: SQLite no aísla un SELECT abierto de los UPDATE
+        # hechos en la misma conexión.
+        for i in range(0, len(cambios), batch_size):
+            lote = [model(pk=fila_pk, **{libro.campo_saldo: s}) for fila_pk, s in cambios[i:i + batch_size]]
+            model.objects.bulk_update(lote, [libro.campo_saldo])
+        if cambios:
+            saldos_recalculados.send(sender=model, cierres=cierres)
+    return len(cambios)
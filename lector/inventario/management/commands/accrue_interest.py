@@ -0,0 +1,72 @@
+import csv
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from inventario import intereses
+
+from .import_ledger import _decimal, _fecha
+
+
+def _tasa(texto):
+    """``2024-01-01=97,5`` -> ``(date(2024, 1, 1), Decimal("97.5"))``."""
+    try:
+        fecha, tasa = texto.split("=")
+        return _fecha(fecha), _decimal(tasa)
+    except ValueError as e:
+        raise CommandError(f"Tasa inválida {texto!r}: usar FECHA=TNA (p.ej. 2024-01-01=97,5). {e}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Devenga intereses de la cuenta MP para un rango de fechas según un cronograma de tasas (TNA), "
+        "agregando filas de interés o reescribiendo la columna ganancia, y recalcula los saldos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("desde", type=_fecha)
+        parser.add_argument("hasta", nargs="?", type=_fecha, default=None, help="Por defecto, hoy.")
+        parser.add_argument(
+            "--tasa",
+            action="append",
+            default=[],
+            help="FECHA=TNA vigente desde esa fecha (se puede repetir).",
+        )
+        parser.add_argument("--tasas", help="CSV con columnas desde,tasa.")
+        parser.add_argument("--capitalizacion", choices=intereses.CAPITALIZACIONES, default=intereses.MENSUAL)
+        parser.add_argument("--modo", choices=intereses.MODOS, default=intereses.FILAS)
+        parser.add_argument("--dry-run", action="store_true", help="Muestra el cálculo sin escribir nada.")
+
+    def handle(self, *args, **options):
+        desde = options["desde"]
+        hasta = options["hasta"] or date.today()
+        if hasta < desde:
+            raise CommandError("La fecha hasta es anterior a desde.")
+        cronograma = [_tasa(texto) for texto in options["tasa"]]
+        if options["tasas"]:
+            cronograma += self._leer_tasas(options["tasas"])
+        try:
+            tasas = intereses.Tasas(cronograma)
+            with transaction.atomic():
+                acreditaciones = intereses.devengar(
+                    desde, hasta, tasas, options["capitalizacion"], options["modo"]
+                )
+                if options["dry_run"]:
+                    transaction.set_rollback(True)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        total = sum(a.centavos for a in acreditaciones)
+        for a in acreditaciones:
+            estado = " (ya acreditado, se respeta)" if a.existente else ""
+            self.stdout.write(f"{a.inicio:%d/%m/%Y} - {a.fin:%d/%m/%Y}: {a.interes}{estado}")
+        sufijo = " (dry-run, sin cambios)" if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"Interés total: {intereses.pesos(total)}{sufijo}"))
+
+    def _leer_tasas(self, ruta):
+        with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+            try:
+                return [(_fecha(fila["desde"]), _decimal(fila["tasa"])) for fila in csv.DictReader(archivo)]
+            except (KeyError, ValueError) as e:
+                raise CommandError(f"Archivo de tasas inválido: {e}")
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia la base SQLite en caliente con la API de backup de SQLite. En modo WAL la copia es una "
+        "lectura: los workers siguen escribiendo mientras corre. Escribe a un temporal y lo renombra al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "destino", nargs="?", default="backups", help="Archivo o carpeta (se nombra con fecha y hora)."
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--paginas",
+            type=int,
+            default=-1,
+            help="Páginas por paso. -1 copia todo en un paso (en WAL no bloquea escrituras); "
+            "sin WAL, pasos chicos liberan el lock entre paso y paso.",
+        )
+        parser.add_argument("--pausa", type=float, default=0.05, help="Segundos entre pasos.")
+        parser.add_argument("--conservar", type=int, default=0, help="Copias a conservar en la carpeta (0: todas).")
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite" or connection.is_in_memory_db():
+            raise CommandError(f"La base '{options['database']}' no es un archivo SQLite.")
+
+        destino = Path(options["destino"])
+        en_carpeta = destino.suffix == ""
+        if en_carpeta:
+            destino = destino / f"db-{timezone.localtime():%Y%m%d-%H%M%S}.sqlite3"
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporal = destino.with_name(destino.name + ".tmp")
+
+        connection.ensure_connection()
+        copia = sqlite3.connect(temporal)
+        try:
+            connection.connection.backup(
+                copia, pages=options["paginas"], progress=self._progreso, sleep=options["pausa"]
+            )
+            (resultado,) = copia.execute("PRAGMA integrity_check").fetchone()
+        except BaseException:
+            copia.close()
+            temporal.unlink(missing_ok=True)
+            raise
+        copia.close()
+        if resultado != "ok":
+            temporal.unlink()
+            raise CommandError(f"La copia no pasó integrity_check: {resultado}")
+        os.replace(temporal, destino)
+        self.stdout.write(self.style.SUCCESS(f"Copia en {destino} ({destino.stat().st_size // 1024} KB)"))
+
+        if en_carpeta and options["conservar"] > 0:
+            for vieja in sorted(destino.parent.glob("db-*.sqlite3"))[: -options["conservar"]]:
+                vieja.unlink()
+                self.stdout.write(f"Borrada {vieja}")
+
+    def _progreso(self, status, remaining, total):
+        if self.verbosity > 1:
+            self.stdout.write(f"  {total - remaining}/{total} páginas")
@@ -0,0 +1,187 @@
+import csv
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from inventario import ledger, rollups, versiones
+from inventario.models import MONEY_VALIDATORS, EntregadoA, ResumenDiario, RetiroBuzon
+
+FORMATOS_FECHA = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"]
+MAX_ERRORES = 50
+
+# libro -> (columnas de texto, columnas de dinero, columnas de catálogo)
+COLUMNAS = {
+    ResumenDiario.Libro.CAJA: (["descripcion"], ["ingreso", "egreso"], {}),
+    ResumenDiario.Libro.MP: ([], ["ingreso", "egreso", "ganancia"], {}),
+    ResumenDiario.Libro.OFRENDAS: (
+        ["concepto"],
+        ["importe"],
+        {"retiro_buzon": RetiroBuzon, "entregado_a": EntregadoA},
+    ),
+}
+
+
+def _fecha(texto):
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto.strip(), formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"fecha inválida: {texto!r}")
+
+
+def _decimal(texto):
+    """Acepta ``1234.56``, ``1234,56`` y ``1.234,56``."""
+    texto = texto.strip().replace(" ", "").replace("$", "")
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    try:
+        return Decimal(texto).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"importe inválido: {texto!r}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa movimientos históricos desde un CSV (ordenado por fecha) a Caja, MP u Ofrendas, "
+        "calculando el saldo corrido en la misma pasada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("libro", choices=list(COLUMNAS))
+        parser.add_argument("archivo")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--delimiter", default=",")
+        parser.add_argument("--encoding", default="utf-8-sig")
+        parser.add_argument(
+            "--crear-catalogos",
+            action="store_true",
+            help="Crea los Retiro buzón / Entregado a que no existan en lugar de fallar.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Valida e inserta, pero deshace todo al final.")
+
+    def handle(self, *args, **options):
+        self.libro = options["libro"]
+        self.model, _ = rollups.FUENTES[self.libro]
+        self.textos, self.montos, self.catalogos = COLUMNAS[self.libro]
+        self.crear_catalogos = options["crear_catalogos"]
+        # Una consulta por catálogo; los nombres se resuelven en memoria.
+        self.ids = {
+            campo: dict(catalogo.objects.values_list("nombre", "pk")) for campo, catalogo in self.catalogos.items()
+        }
+        self.errores = []
+        self.hay_posteriores = False
+
+        with open(options["archivo"], newline="", encoding=options["encoding"]) as archivo:
+            lector = csv.DictReader(archivo, delimiter=options["delimiter"])
+            faltantes = {"fecha", *self.catalogos} - set(lector.fieldnames or [])
+            if faltantes:
+                raise CommandError(f"Faltan columnas en el CSV: {', '.join(sorted(faltantes))}")
+            with transaction.atomic(using=self.model.objects.db):
+                importadas, primera = self._importar(lector, options["batch_size"])
+                if self.errores:
+                    raise CommandError(self._resumen_errores())
+                if primera is not None:
+                    self._post_importacion(primera)
+                if options["dry_run"]:
+                    transaction.set_rollback(True)
+
+        sufijo = " (dry-run, sin cambios)" if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"{importadas} movimientos importados en {self.libro}{sufijo}"))
+
+    def _importar(self, lector, batch_size):
+        primera = anterior = None
+        saldo = None
+        lote = []
+        importadas = 0
+        libro = ledger.LIBROS[self.model]
+        for linea, fila in enumerate(lector, start=2):
+            instancia = self._instancia(linea, fila)
+            if instancia is None:
+                continue
+            if anterior is not None and instancia.fecha < anterior:
+                self._error(linea, "fecha", "el CSV debe estar ordenado por fecha")
+                continue
+            if saldo is None:
+                primera = instancia.fecha
+                self.hay_posteriores = self.model.objects.filter(fecha__gt=primera).exists()
+                saldo = ledger.saldo_anterior(self.model, primera)
+            anterior = instancia.fecha
+            saldo = saldo + libro.delta([getattr(instancia, campo) or 0 for campo in libro.campos])
+            instancia.saldo = saldo
+            lote.append((linea, instancia))
+            if len(lote) >= batch_size:
+                importadas += self._guardar(lote)
+                lote = []
+            if len(self.errores) >= MAX_ERRORES:
+                break
+        importadas += self._guardar(lote)
+        return importadas, primera
+
+    def _instancia(self, linea, fila):
+        errores = len(self.errores)
+        valores = {}
+        try:
+            valores["fecha"] = _fecha(fila["fecha"])
+        except ValueError as e:
+            self._error(linea, "fecha", e)
+        for campo in self.textos:
+            valores[campo] = (fila.get(campo) or "").strip()
+        for campo in self.montos:
+            texto = (fila.get(campo) or "").strip()
+            if not texto:
+                continue  # se usa el default del modelo
+            try:
+                valores[campo] = _decimal(texto)
+            except ValueError as e:
+                self._error(linea, campo, e)
+        for campo in self.catalogos:
+            pk = self._catalogo(campo, (fila.get(campo) or "").strip())
+            if pk is None:
+                self._error(linea, campo, f"no existe {fila.get(campo)!r}")
+            valores[f"{campo}_id"] = pk
+        if len(self.errores) > errores:
+            return None
+        return self.model(**valores)
+
+    def _catalogo(self, campo, nombre):
+        ids = self.ids[campo]
+        if nombre and nombre not in ids and self.crear_catalogos:
+            ids[nombre] = self.catalogos[campo].objects.create(nombre=nombre).pk
+        return ids.get(nombre)
+
+    def _guardar(self, lote):
+        """Valida las columnas de dinero de todo el lote y lo inserta con un solo ``bulk_create``."""
+        for linea, instancia in lote:
+            for campo in self.montos:
+                valor = getattr(instancia, campo)
+                if valor is None:
+                    self._error(linea, campo, "falta el importe")
+                    continue
+                for validador in MONEY_VALIDATORS:
+                    try:
+                        validador(valor)
+                    except ValidationError as e:
+                        self._error(linea, campo, " ".join(e.messages))
+        if self.errores or not lote:
+            return 0
+        self.model.objects.bulk_create([instancia for _, instancia in lote], batch_size=len(lote))
+        return len(lote)
+
+    def _post_importacion(self, primera):
+        """``bulk_create`` no dispara señales: se ajustan saldos, resúmenes y versiones a mano."""
+        if self.hay_posteriores:
+            # Las filas importadas quedaron intercaladas con otras existentes.
+            ledger.recalcular_saldos(self.model, primera)
+        rollups.reconstruir_desde(self.model, primera)
+        versiones.incrementar_al_confirmar(versiones.nombre_de(self.model))
+
+    def _error(self, linea, columna, mensaje):
+        self.errores.append((linea, columna, str(mensaje)))
+
+    def _resumen_errores(self):
+        lineas = [f"línea {linea}, {columna}: {mensaje}" for linea, columna, mensaje in self.errores[:MAX_ERRORES]]
+        return "El CSV tiene errores, no se importó nada:\n" + "\n".join(lineas)
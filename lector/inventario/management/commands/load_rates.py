@@ -0,0 +1,39 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario import cotizaciones
+from inventario.models import UPPER_3
+
+from .import_ledger import MAX_ERRORES, _decimal, _fecha
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga cotizaciones históricas desde un CSV con columnas codigo,fecha,valor "
+        "(las que ya existen para ese código y fecha se actualizan)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo")
+        parser.add_argument("--delimiter", default=",")
+        parser.add_argument("--encoding", default="utf-8-sig")
+
+    def handle(self, *args, **options):
+        filas = []
+        errores = []
+        with open(options["archivo"], newline="", encoding=options["encoding"]) as archivo:
+            for linea, fila in enumerate(csv.DictReader(archivo, delimiter=options["delimiter"]), start=2):
+                try:
+                    codigo = (fila.get("codigo") or "").strip().upper()
+                    UPPER_3(codigo)
+                    filas.append((codigo, _fecha(fila.get("fecha") or ""), _decimal(fila.get("valor") or "")))
+                except ValidationError as e:
+                    errores.append(f"línea {linea}: {' '.join(e.messages)}")
+                except ValueError as e:
+                    errores.append(f"línea {linea}: {e}")
+        if errores:
+            raise CommandError("El CSV tiene errores, no se cargó nada:\n" + "\n".join(errores[:MAX_ERRORES]))
+        cargadas = cotizaciones.cargar(filas)
+        self.stdout.write(self.style.SUCCESS(f"{cargadas} cotizaciones cargadas"))
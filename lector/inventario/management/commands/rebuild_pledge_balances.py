@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventario import compromisos
+
+
+class Command(BaseCommand):
+    help = "Recalcula Compromiso.saldo como saldo corrido por sobre (usar al activar COMPROMISO_SALDO_INCREMENTAL)."
+
+    def handle(self, *args, **options):
+        actualizadas = compromisos.recalcular_todos()
+        self.stdout.write(self.style.SUCCESS(f"{actualizadas} compromisos actualizados"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from inventario import rollups
+from inventario.models import ResumenDiario
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los resúmenes diarios (ResumenDiario) de Caja, MP y Ofrendas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--libro",
+            action="append",
+            choices=ResumenDiario.Libro.values,
+            help="Libro a reconstruir (se puede repetir). Por defecto, todos.",
+        )
+
+    def handle(self, *args, **options):
+        generados = rollups.reconstruir(options["libro"])
+        for libro, dias in generados.items():
+            self.stdout.write(self.style.SUCCESS(f"{libro}: {dias} días"))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario import conciliacion
+
+from .import_ledger import _decimal
+
+
+class Command(BaseCommand):
+    help = (
+        "Controla que cada saldo guardado sea el saldo anterior más los movimientos (Caja, MP, Ofrendas, "
+        "Compromisos con saldo por sobre y moneda extranjera) y compara las ofrendas de cada mes con los "
+        "ingresos de Caja. Termina con error si encuentra diferencias (útil desde cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max", type=int, default=20, help="Quiebres a listar por libro.")
+        parser.add_argument(
+            "--tolerancia", type=_decimal, default=conciliacion.CENTAVO, help="Diferencia mensual aceptada."
+        )
+        parser.add_argument("--sin-cruce", action="store_true", help="Omite ofrendas contra ingresos de Caja.")
+
+    def handle(self, *args, **options):
+        problemas = 0
+        for model, libro in conciliacion.libros():
+            problemas += self._informar(model._meta.verbose_name_plural, conciliacion.saldos, options["max"], libro)
+        problemas += self._informar(
+            "Moneda extranjera (saldo ARS)", conciliacion.moneda_extranjera, options["max"]
+        )
+
+        if not options["sin_cruce"]:
+            meses = 0
+            for d in conciliacion.ofrendas_vs_caja(options["tolerancia"]):
+                meses += 1
+                self.stdout.write(
+                    f"  {d.mes:02d}/{d.anio}: ofrendas {d.ofrendas} > ingresos de Caja {d.ingresos_caja} "
+                    f"(faltan {d.ofrendas - d.ingresos_caja})"
+                )
+            estilo = self.style.WARNING if meses else self.style.SUCCESS
+            self.stdout.write(estilo(f"Ofrendas vs Caja: {meses} meses con ofrendas sin ingresar"))
+            problemas += meses
+
+        if problemas:
+            raise CommandError(f"Conciliación con {problemas} diferencias.")
+        self.stdout.write(self.style.SUCCESS("Conciliación sin diferencias."))
+
+    def _informar(self, nombre, control, maximo, *args):
+        contador = []
+        quiebres = 0
+        for quiebre in control(*args, contador=contador):
+            quiebres += 1
+            if quiebres <= maximo:
+                self.stdout.write(
+                    f"  #{quiebre.pk} {quiebre.fecha:%d/%m/%Y}: esperado {quiebre.esperado}, guardado {quiebre.guardado}"
+                )
+        filas = contador[0] if contador else 0
+        estilo = self.style.WARNING if quiebres else self.style.SUCCESS
+        self.stdout.write(estilo(f"{nombre}: {filas} filas, {quiebres} quiebres"))
+        return quiebres
@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from inventario import cotizaciones
+
+from .import_ledger import _fecha
+
+
+class Command(BaseCommand):
+    help = (
+        "Revalúa saldo_ars de todas las filas de moneda extranjera "
+        "a la cotización vigente en una fecha (por defecto, hoy)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("fecha", nargs="?", type=_fecha, default=None)
+
+    def handle(self, *args, **options):
+        fecha = options["fecha"] or date.today()
+        actualizadas, sin_cotizacion = cotizaciones.revaluar(fecha)
+        if sin_cotizacion:
+            self.stderr.write(
+                self.style.WARNING(f"Sin cotización al {fecha:%d/%m/%Y}: {', '.join(sin_cotizacion)} (no se tocaron)")
+            )
+        self.stdout.write(self.style.SUCCESS(f"{actualizadas} filas revaluadas al {fecha:%d/%m/%Y}"))
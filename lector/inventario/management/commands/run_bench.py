@@ -0,0 +1,186 @@
+import json
+import platform
+import statistics
+import time
+from contextlib import ExitStack
+from datetime import date, timedelta
+
+import django
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from inventario import ledger, models
+from inventario.admin import KeysetAdminMixin
+from inventario.changelist import SIGUIENTE_VAR
+
+# modelo -> (filtros extra a medir, texto de búsqueda)
+ESCENARIOS = {
+    models.Caja: ([], "pago"),
+    models.MP: ([], None),
+    models.Vencimiento: (["estado__id__exact", "concepto__id__exact"], "factura"),
+    models.MonedaExtranjera: (["codigo__exact", "estado__id__exact"], None),
+    models.Compromiso: ([], "gómez"),
+    models.OfrendaDonacion: (["retiro_buzon__id__exact", "entregado_a__id__exact"], "ofrenda"),
+    models.CuotaInac: (["anio__exact"], "ana"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el admin de inventario (changelists, filtros, búsquedas, exportaciones y recálculo de saldos) "
+        "y guarda los tiempos en JSON. Todo corre dentro de una transacción que se deshace al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeticiones", type=int, default=3)
+        parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, stdout).")
+        parser.add_argument("--comparar", help="JSON de una corrida anterior para mostrar la diferencia.")
+        parser.add_argument("--host", default="localhost", help="Host de los requests (debe estar en ALLOWED_HOSTS).")
+        parser.add_argument("--sin-exportar", action="store_true", help="Omite las exportaciones CSV/XLSX.")
+
+    def handle(self, *args, **options):
+        self.repeticiones = options["repeticiones"]
+        self.resultados = []
+        anterior = self._leer(options["comparar"]) if options["comparar"] else None
+
+        with transaction.atomic():
+            # Puede existir (p.ej. creado a mano); los cambios se deshacen con el resto al final.
+            usuario, _ = get_user_model().objects.update_or_create(
+                username="bench", defaults={"email": "bench@example.com", "is_staff": True, "is_superuser": True}
+            )
+            self.client = Client(HTTP_HOST=options["host"])
+            self.client.force_login(usuario)
+            for model, (filtros, busqueda) in ESCENARIOS.items():
+                self._changelist(model, filtros, busqueda, not options["sin_exportar"])
+            for model, libro in ledger.LIBROS.items():
+                if libro.particion is None:
+                    self._recalculo(model)
+            transaction.set_rollback(True)
+
+        informe = {
+            "fecha": timezone.now().isoformat(),
+            "base": connections["default"].vendor,
+            "django": django.get_version(),
+            "python": platform.python_version(),
+            "repeticiones": self.repeticiones,
+            "filas": {m._meta.label: m.objects.count() for m in [*ESCENARIOS, models.ResumenDiario]},
+            "resultados": self.resultados,
+        }
+        texto = json.dumps(informe, indent=2, ensure_ascii=False)
+        if options["salida"]:
+            with open(options["salida"], "w", encoding="utf-8") as archivo:
+                archivo.write(texto)
+            self.stdout.write(self.style.SUCCESS(f"Resultados en {options['salida']}"))
+        else:
+            self.stdout.write(texto)
+        if anterior:
+            self._comparar(anterior)
+
+    # ====== Escenarios ======
+    def _changelist(self, model, filtros, busqueda, exportar):
+        model_admin = admin.site._registry[model]
+        url = reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist")
+        nombre = model._meta.model_name
+        self._request(f"{nombre}:lista", url)
+
+        ultima = model.objects.order_by().values_list(model_admin.date_hierarchy or "pk", flat=True).last()
+        if isinstance(ultima, date):
+            desde = ultima - timedelta(days=365)
+            campo = model_admin.date_hierarchy
+            self._request(
+                f"{nombre}:rango_fecha",
+                url,
+                {f"{campo}_from": desde.strftime("%d/%m/%Y"), f"{campo}_to": ultima.strftime("%d/%m/%Y")},
+            )
+        self._request(f"{nombre}:pagina_media", url, self._pagina_media(model, model_admin))
+        for filtro in filtros:
+            self._request(f"{nombre}:filtro:{filtro}", url, {filtro: self._valor_filtro(model, filtro)})
+        if busqueda:
+            self._request(f"{nombre}:busqueda", url, {"q": busqueda})
+        if exportar and getattr(model_admin, "export_fields", None):
+            for formato in ("csv", "xlsx"):
+                url_export = reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_exportar", args=[formato])
+                self._request(f"{nombre}:exportar_{formato}", url_export)
+
+    def _pagina_media(self, model, model_admin):
+        """Parámetros para ir a la mitad del listado: cursor en los libros con keyset, ``p`` en el resto."""
+        total = model.objects.count()
+        if isinstance(model_admin, KeysetAdminMixin):
+            fila = model.objects.order_by("-fecha", "-pk").values_list("fecha", "pk")[total // 2 : total // 2 + 1]
+            return {SIGUIENTE_VAR: "{}.{}".format(*fila[0])} if fila else {}
+        return {"p": max(1, total // model_admin.list_per_page // 2)}
+
+    def _valor_filtro(self, model, filtro):
+        campo = filtro.split("__")[0]
+        columna = f"{campo}_id" if model._meta.get_field(campo).is_relation else campo
+        return model.objects.order_by().values_list(columna, flat=True).first()
+
+    def _request(self, nombre, url, params=None):
+        def medir():
+            response = self.client.get(url, params or {})
+            if response.status_code != 200:
+                raise CommandError(f"{nombre}: {url} respondió {response.status_code}")
+            # Las exportaciones son streaming: el tiempo incluye generar todo el archivo.
+            if response.streaming:
+                bytes_ = sum(len(parte) for parte in response.streaming_content)
+            else:
+                bytes_ = len(response.content)
+            return bytes_
+
+        self._medir(nombre, medir, url=url, params=params)
+
+    def _recalculo(self, model):
+        primera = model.objects.order_by("fecha", "pk").values_list("fecha", flat=True).first()
+        if primera is None:
+            return
+
+        def medir():
+            # Se invalida el saldo de la primera fila para que el recálculo escriba todo el libro.
+            model.objects.filter(fecha=primera).update(saldo=ledger.CERO - 1)
+            return ledger.recalcular_saldos(model, primera)
+
+        self._medir(f"{model._meta.model_name}:recalcular_saldos", medir)
+
+    def _medir(self, nombre, funcion, **extra):
+        tiempos = []
+        with ExitStack() as pila:
+            # Todas las conexiones: las lecturas pueden ir a la réplica (``inventario.replicas``).
+            consultas = [pila.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+            for _ in range(self.repeticiones):
+                inicio = time.perf_counter()
+                resultado = funcion()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+        self.resultados.append(
+            {
+                "nombre": nombre,
+                **extra,
+                "ms": [round(t, 2) for t in tiempos],
+                "mediana_ms": round(statistics.median(tiempos), 2),
+                "consultas": sum(len(capturadas) for capturadas in consultas) // self.repeticiones,
+                "resultado": resultado,
+            }
+        )
+        self.stderr.write(f"{nombre}: {statistics.median(tiempos):.1f} ms")
+
+    # ====== Comparación ======
+    def _leer(self, ruta):
+        with open(ruta, encoding="utf-8") as archivo:
+            return {r["nombre"]: r for r in json.load(archivo)["resultados"]}
+
+    def _comparar(self, anterior):
+        self.stdout.write("\nescenario\tantes_ms\tahora_ms\tcambio")
+        for resultado in self.resultados:
+            previo = anterior.get(resultado["nombre"])
+            if not previo or not previo["mediana_ms"]:
+                continue
+            cambio = resultado["mediana_ms"] / previo["mediana_ms"] - 1
+            estilo = self.style.ERROR if cambio > 0.2 else self.style.SUCCESS if cambio < -0.2 else str
+            self.stdout.write(
+                estilo(f"{resultado['nombre']}\t{previo['mediana_ms']}\t{resultado['mediana_ms']}\t{cambio:+.0%}")
+            )
@@ -0,0 +1,266 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+
+from inventario import catalogos, ledger, models, proyeccion, rollups, versiones
+
+BATCH_SIZE = 2000
+CENTAVO = Decimal("0.01")
+
+# Filas por año con ``--escala 1`` (aprox. el volumen real de la iglesia).
+POR_ANIO = {
+    models.Caja: 2500,
+    models.MP: 250,
+    models.OfrendaDonacion: 1200,
+    models.Vencimiento: 500,
+    models.MonedaExtranjera: 120,
+}
+SOBRES = 40
+HERMANOS_CUOTA = 60
+
+# Se borran en este orden con ``--limpiar`` (primero los que tienen FKs PROTECT).
+GENERADOS = [
+    models.Caja,
+    models.MP,
+    models.OfrendaDonacion,
+    models.Vencimiento,
+    models.MonedaExtranjera,
+    models.Compromiso,
+    models.AsignacionSobres,
+    models.CuotaInac,
+    models.ResumenDiario,
+]
+
+# Catálogos mínimos por si la base no pasó por la migración 0002.
+CATALOGOS = {
+    models.EstadoVencimiento: ["A vencer", "Vencida", "Pagada", "No pagada"],
+    models.Concepto: ["Luz iglesia", "Gas iglesia", "Librería", "Otros"],
+    models.Situacion: ["Efectivo", "Débito", "Otros"],
+    models.Descripcion: ["Iglesia", "Casa pastoral", "Escuelita"],
+    models.EstadoMoneda: ["Activo", "En proceso", "Terminado"],
+    models.RetiroBuzon: ["Pastor", "Tesorero", "Diácono"],
+    models.EntregadoA: ["Tesorero", "Protesorero"],
+}
+
+NOMBRES = ["Ana", "Juan", "María", "José", "Lucía", "Pedro", "Sofía", "Pablo", "Marta", "Daniel", "Rut", "Esteban"]
+APELLIDOS = ["Gómez", "Pérez", "Rodríguez", "Fernández", "López", "Díaz", "Martínez", "Sosa", "Romero", "Álvarez"]
+DESCRIPCIONES_CAJA = ["Ofrenda culto", "Compra librería", "Pago luz", "Pago gas", "Limpieza", "Diezmo", "Viáticos", "Reparaciones"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos con volúmenes realistas en todos los modelos de inventario, "
+        "para medir el admin con ``run_bench``. No usar en producción."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--anios", type=int, default=10, help="Años de historia hacia atrás desde hoy.")
+        parser.add_argument("--escala", type=float, default=1.0, help="Multiplica las filas por año.")
+        parser.add_argument("--semilla", type=int, default=1, help="Semilla del generador (resultados repetibles).")
+        parser.add_argument(
+            "--limpiar",
+            action="store_true",
+            help="Borra antes los movimientos, compromisos, cuotas y resúmenes existentes.",
+        )
+        parser.add_argument(
+            "--yes",
+            action="store_true",
+            help="Confirma que la base es de prueba (sin DEBUG no corre si no se pasa).",
+        )
+
+    def handle(self, *args, **options):
+        if not (settings.DEBUG or options["yes"]):
+            raise CommandError("Sin DEBUG la base puede ser la real: pasar --yes para confirmar que es de prueba.")
+        self.rng = random.Random(options["semilla"])
+        self.escala = options["escala"]
+        hoy = date.today()
+        self.anios = list(range(hoy.year - options["anios"] + 1, hoy.year + 1))
+        self.hasta = hoy
+
+        with transaction.atomic():
+            if options["limpiar"]:
+                self._limpiar()
+            elif any(model.objects.exists() for model in GENERADOS):
+                raise CommandError("Ya hay datos cargados: usar --limpiar para reemplazarlos.")
+
+            self.ids = {model: self._catalogo(model, nombres) for model, nombres in CATALOGOS.items()}
+            creadas = {
+                models.Caja: self._libro(models.Caja, self._caja),
+                models.MP: self._libro(models.MP, self._mp),
+                models.OfrendaDonacion: self._libro(models.OfrendaDonacion, self._ofrenda),
+                models.Vencimiento: self._vencimientos(),
+                models.MonedaExtranjera: self._monedas(),
+            }
+            creadas[models.Compromiso] = self._compromisos()
+            creadas[models.CuotaInac] = self._cuotas()
+            dias = rollups.reconstruir()
+
+            # bulk_create no dispara señales: se invalidan los caches a mano.
+            for model in GENERADOS:
+                versiones.incrementar_al_confirmar(versiones.nombre_de(model))
+            catalogos.invalidar()
+            proyeccion.invalidar()
+
+        for model, cantidad in creadas.items():
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {cantidad}")
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes diarios: {sum(dias.values())}"))
+
+    # ====== Utilidades ======
+    def _limpiar(self):
+        """``DELETE FROM`` de cada tabla, como ``flush``: ``delete()`` cargaría cada fila para disparar señales."""
+        connection = connections[router.db_for_write(GENERADOS[0])]
+        tablas = [model._meta.db_table for model in GENERADOS]
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tablas))
+
+    def _cantidad(self, model):
+        return max(1, round(POR_ANIO[model] * self.escala))
+
+    def _importe(self, minimo, maximo):
+        return Decimal(self.rng.randint(minimo * 100, maximo * 100)) * CENTAVO
+
+    def _fechas(self, cantidad):
+        """``cantidad`` fechas por año, ordenadas, sin pasar de hoy."""
+        fechas = []
+        for anio in self.anios:
+            inicio = date(anio, 1, 1)
+            dias = ((min(date(anio, 12, 31), self.hasta) - inicio).days) + 1
+            fechas.extend(sorted(inicio + timedelta(days=self.rng.randrange(dias)) for _ in range(cantidad)))
+        return fechas
+
+    def _hermano(self):
+        return f"{self.rng.choice(NOMBRES)} {self.rng.choice(APELLIDOS)}"
+
+    def _catalogo(self, model, nombres):
+        model.objects.bulk_create([model(nombre=nombre) for nombre in nombres], ignore_conflicts=True)
+        return list(model.objects.values_list("pk", flat=True))
+
+    def _guardar(self, model, objetos):
+        model.objects.bulk_create(objetos, batch_size=BATCH_SIZE)
+        return len(objetos)
+
+    # ====== Libros con saldo corrido ======
+    def _libro(self, model, fila):
+        """Genera las filas en orden de fecha calculando el saldo en la misma pasada."""
+        libro = ledger.LIBROS[model]
+        saldo = ledger.CERO
+        lote = []
+        creadas = 0
+        for fecha in self._fechas(self._cantidad(model)):
+            obj = fila(fecha)
+            saldo += libro.delta([getattr(obj, campo) for campo in libro.campos])
+            obj.saldo = saldo
+            lote.append(obj)
+            if len(lote) >= BATCH_SIZE:
+                creadas += self._guardar(model, lote)
+                lote = []
+        return creadas + self._guardar(model, lote)
+
+    def _caja(self, fecha):
+        ingreso = self.rng.random() < 0.55
+        monto = self._importe(500, 150000)
+        return models.Caja(
+            fecha=fecha,
+            descripcion=self.rng.choice(DESCRIPCIONES_CAJA),
+            ingreso=monto if ingreso else ledger.CERO,
+            egreso=ledger.CERO if ingreso else monto,
+        )
+
+    def _mp(self, fecha):
+        ingreso = self.rng.random() < 0.6
+        monto = self._importe(1000, 300000)
+        return models.MP(
+            fecha=fecha,
+            ingreso=monto if ingreso else ledger.CERO,
+            egreso=ledger.CERO if ingreso else monto,
+            ganancia=self._importe(0, 5000) if fecha.day > 25 else ledger.CERO,
+        )
+
+    def _ofrenda(self, fecha):
+        return models.OfrendaDonacion(
+            fecha=fecha,
+            retiro_buzon_id=self.rng.choice(self.ids[models.RetiroBuzon]),
+            entregado_a_id=self.rng.choice(self.ids[models.EntregadoA]),
+            importe=self._importe(100, 80000),
+            concepto=self.rng.choice(["Ofrenda", "Donación", "Diezmo", ""]),
+        )
+
+    # ====== Resto de los modelos ======
+    def _vencimientos(self):
+        objetos = []
+        for fecha in self._fechas(self._cantidad(models.Vencimiento)):
+            objetos.append(
+                models.Vencimiento(
+                    fecha=fecha,
+                    fecha_vencimiento=fecha + timedelta(days=self.rng.randint(5, 40)),
+                    concepto_id=self.rng.choice(self.ids[models.Concepto]),
+                    descripcion_id=self.rng.choice(self.ids[models.Descripcion]),
+                    estado_id=self.rng.choice(self.ids[models.EstadoVencimiento]),
+                    situacion_id=self.rng.choice(self.ids[models.Situacion]),
+                    importe=self._importe(2000, 200000),
+                    nota=self.rng.choice(["", "", "Pagado en término", "Reclamar factura"]),
+                )
+            )
+        return self._guardar(models.Vencimiento, objetos)
+
+    def _monedas(self):
+        tenencia = {"USD": Decimal("0"), "EUR": Decimal("0")}
+        cotizacion = {"USD": Decimal("100"), "EUR": Decimal("110")}
+        objetos = []
+        for fecha in self._fechas(self._cantidad(models.MonedaExtranjera)):
+            codigo = "USD" if self.rng.random() < 0.8 else "EUR"
+            cotizacion[codigo] = (cotizacion[codigo] * Decimal(self.rng.uniform(0.99, 1.02))).quantize(Decimal("0.0001"))
+            compra = self._importe(10, 500) if self.rng.random() < 0.6 else Decimal("0")
+            egreso = min(tenencia[codigo], self._importe(10, 300)) if not compra else Decimal("0")
+            tenencia[codigo] += compra - egreso
+            objetos.append(
+                models.MonedaExtranjera(
+                    codigo=codigo,
+                    fecha=fecha,
+                    compra_usd=compra,
+                    compra_ars=(compra * cotizacion[codigo]).quantize(CENTAVO),
+                    egreso_usd=egreso,
+                    venta_ars=(egreso * cotizacion[codigo]).quantize(CENTAVO),
+                    usd_hoy=cotizacion[codigo],
+                    saldo_ars=(tenencia[codigo] * cotizacion[codigo]).quantize(CENTAVO),
+                    estado_id=self.rng.choice(self.ids[models.EstadoMoneda]),
+                )
+            )
+        return self._guardar(models.MonedaExtranjera, objetos)
+
+    def _compromisos(self):
+        # sobre_n es único y va de 1 a 50.
+        models.AsignacionSobres.objects.bulk_create(
+            [models.AsignacionSobres(sobre_n=n, hermano=self._hermano()) for n in range(1, SOBRES + 1)]
+        )
+        asignaciones = list(models.AsignacionSobres.objects.order_by("sobre_n"))
+        objetos = []
+        for asignacion in asignaciones:
+            saldo = ledger.CERO
+            mensual = self._importe(1000, 20000)
+            for anio in self.anios:
+                for mes in range(1, 13):
+                    fecha = date(anio, mes, self.rng.randint(1, 28))
+                    if fecha > self.hasta or self.rng.random() < 0.15:
+                        continue
+                    saldo += mensual
+                    objetos.append(models.Compromiso(fecha=fecha, asignacion=asignacion, importe=mensual, saldo=saldo))
+        return self._guardar(models.Compromiso, objetos)
+
+    def _cuotas(self):
+        # unique_cuota_por_mes_anio_hermano: se generan nombres distintos y un (mes, año) por hermano.
+        hermanos = set()
+        while len(hermanos) < HERMANOS_CUOTA:
+            hermanos.add(f"{self._hermano()} {len(hermanos) + 1}")
+        objetos = [
+            models.CuotaInac(hermano=hermano, mes=mes, anio=anio)
+            for hermano in sorted(hermanos)
+            for anio in self.anios
+            for mes in range(1, 13)
+            if date(anio, mes, 1) <= self.hasta and self.rng.random() < 0.85
+        ]
+        return self._guardar(models.CuotaInac, objetos)
@@ -0,0 +1,72 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# "import time:       self |  cumulative | [espacios de anidamiento]módulo"
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+_HIJO = (
+    "import time; inicio = time.perf_counter(); "
+    "from inventario import arranque; arranque.medir(inicio, {url!r}, {host!r}, {usuario!r}, {calentado!r})"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el arranque en frío en procesos nuevos: tiempo de import por módulo y por paquete (-X importtime), "
+        "django.setup() y el primer y segundo request, sin calentar y después de arranque.calentar()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="/admin/")
+        parser.add_argument("--host", default="localhost", help="Host de los requests (debe estar en ALLOWED_HOSTS).")
+        parser.add_argument("--usuario", help="Usuario con el que se hacen los requests (por defecto, anónimo).")
+        parser.add_argument("--top", type=int, default=20, help="Módulos a listar.")
+
+    def handle(self, *args, **options):
+        frio, importaciones = self._correr(options, calentado=False)
+        calentado, _ = self._correr(options, calentado=True)
+
+        self.stdout.write(f"Importaciones más lentas (acumulado, de {len(importaciones)} módulos):")
+        for modulo, (propio, acumulado) in sorted(importaciones.items(), key=lambda m: -m[1][1])[: options["top"]]:
+            self.stdout.write(f"  {acumulado / 1000:8.1f} ms  {modulo}  (propio {propio / 1000:.1f} ms)")
+
+        paquetes = defaultdict(int)
+        for modulo, (propio, _) in importaciones.items():
+            paquetes[modulo.split(".")[0]] += propio
+        self.stdout.write("Por paquete (tiempo propio):")
+        for paquete, propio in sorted(paquetes.items(), key=lambda p: -p[1])[:10]:
+            self.stdout.write(f"  {propio / 1000:8.1f} ms  {paquete}")
+
+        self.stdout.write(f"Arranque ({options['url']} → {frio['status']}):")
+        self.stdout.write(f"  {'':22}{'en frío':>10}{'calentado':>12}")
+        for clave in ("setup", "calentar", "primer_request", "segundo_request"):
+            valores = [f"{t[clave] * 1000:.1f} ms" if clave in t else "-" for t in (frio, calentado)]
+            self.stdout.write(f"  {clave:22}{valores[0]:>10}{valores[1]:>12}")
+
+    def _correr(self, options, calentado):
+        codigo = _HIJO.format(url=options["url"], host=options["host"], usuario=options["usuario"], calentado=calentado)
+        proceso = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", codigo],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "lector.settings")},
+            capture_output=True,
+            text=True,
+        )
+        if proceso.returncode:
+            errores = [l for l in proceso.stderr.splitlines() if not l.startswith("import time:")]
+            raise CommandError("Falló la medición:\n" + "\n".join(errores[-20:]))
+
+        importaciones = {}
+        for linea in proceso.stderr.splitlines():
+            match = _IMPORTTIME.match(linea)
+            if match:
+                propio, acumulado, _, modulo = match.groups()
+                importaciones[modulo] = (int(propio), int(acumulado))
+        return json.loads(proceso.stdout.strip().splitlines()[-1]), importaciones
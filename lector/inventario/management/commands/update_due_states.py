@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario import vencimientos
+from inventario.models import EstadoVencimiento
+
+from .import_ledger import _fecha
+
+
+class Command(BaseCommand):
+    help = (
+        'Pasa a "Vencida" los vencimientos pendientes ya vencidos y a "A vencer" los próximos. '
+        "Pensado para correr desde cron cada pocos minutos: si no hay nada que cambiar no escribe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias-aviso", type=int, default=vencimientos.DIAS_AVISO)
+        parser.add_argument("--hoy", type=_fecha, help="Fecha de referencia (por defecto, hoy).")
+
+    def handle(self, *args, **options):
+        try:
+            cambios = vencimientos.actualizar_estados(options["hoy"], options["dias_aviso"])
+        except EstadoVencimiento.DoesNotExist as e:
+            raise CommandError(str(e))
+        for estado, filas in cambios.items():
+            self.stdout.write(f"{estado}: {filas}")
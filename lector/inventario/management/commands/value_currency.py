@@ -0,0 +1,66 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario import valuacion
+from inventario.models import MonedaExtranjera
+
+from .import_ledger import _decimal, _fecha
+
+
+def _cotizacion(texto):
+    """``USD=1050,5`` -> ``("USD", Decimal("1050.50"))``."""
+    try:
+        codigo, valor = texto.split("=")
+        return codigo.strip().upper(), _decimal(valor)
+    except ValueError as e:
+        raise CommandError(f"Cotización inválida {texto!r}: usar CODIGO=VALOR. {e}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Valúa las tenencias de moneda extranjera por lotes (FIFO o costo promedio) y muestra, por código, "
+        "tenencia, costo, resultado realizado y no realizado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--metodo", choices=valuacion.METODOS, default=valuacion.FIFO)
+        parser.add_argument("--codigo", action="append", help="Limitar a un código (se puede repetir).")
+        parser.add_argument("--hasta", type=_fecha, help="Valuar la posición a esa fecha.")
+        parser.add_argument(
+            "--cotizacion",
+            action="append",
+            default=[],
+            help="CODIGO=VALOR para valuar lo no realizado (por defecto, usd_hoy de cada fila).",
+        )
+        parser.add_argument("--detalle", help="CSV con el resultado de cada fila.")
+
+    def handle(self, *args, **options):
+        queryset = MonedaExtranjera.objects.all()
+        if options["codigo"]:
+            queryset = queryset.filter(codigo__in=[c.upper() for c in options["codigo"]])
+        if options["hasta"]:
+            queryset = queryset.filter(fecha__lte=options["hasta"])
+        cotizaciones = dict(_cotizacion(texto) for texto in options["cotizacion"])
+
+        valuaciones = valuacion.valuar(options["metodo"], queryset, cotizaciones)
+        if options["detalle"]:
+            self._detalle(options["detalle"], valuaciones)
+
+        faltantes = sum(1 for v in valuaciones if v.faltante)
+        if faltantes:
+            self.stderr.write(self.style.WARNING(f"{faltantes} egresos superan la tenencia del momento."))
+        for codigo, total in valuacion.resumen(valuaciones).items():
+            self.stdout.write(
+                f"{codigo}: tenencia {total['tenencia']} a {total['cotizacion']} = {total['valor_ars']} ARS | "
+                f"costo {total['costo']} | realizado {total['realizado']} | no realizado {total['no_realizado']}"
+            )
+
+    def _detalle(self, ruta, valuaciones):
+        campos = ["pk", "codigo", "fecha", "tenencia", "costo", "cotizacion", "realizado", "no_realizado", "faltante"]
+        with open(ruta, "w", newline="", encoding="utf-8-sig") as archivo:
+            writer = csv.writer(archivo)
+            writer.writerow(campos)
+            for v in valuaciones:
+                writer.writerow([getattr(v, campo) for campo in campos])
+        self.stdout.write(self.style.SUCCESS(f"Detalle en {ruta}"))
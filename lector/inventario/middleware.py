@@ -0,0 +1,146 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import replicas
+
+logger = logging.getLogger("inventario.consultas")
+
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def huella(sql):
+    """SQL sin literales ni parámetros: iguala las consultas que sólo difieren en valores."""
+    sql = _LITERALES.sub("?", sql)
+    sql = _LISTAS.sub("(...)", sql)
+    return _ESPACIOS.sub(" ", sql).strip()
+
+
+class _Contador:
+    """``execute_wrapper`` que cuenta consultas, tiempo y repeticiones por huella."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+        self.huellas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+            self.consultas += 1
+            self.huellas[huella(sql)] += 1
+
+
+class QueryBudgetMiddleware:
+    """Registra en el log las vistas del admin que superan el presupuesto de consultas.
+
+    Se configura con ``QUERY_BUDGET`` (cantidad de consultas) y ``QUERY_BUDGET_MS``
+    (tiempo total en la base). El aviso incluye la vista y la consulta más repetida,
+    que en un N+1 es la que se ejecuta una vez por fila.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_consultas = settings.QUERY_BUDGET
+        self.max_ms = settings.QUERY_BUDGET_MS
+        self.prefijo = settings.QUERY_BUDGET_PATH_PREFIX
+
+    def __call__(self, request):
+        if not request.path.startswith(self.prefijo):
+            return self.get_response(request)
+
+        contador = _Contador()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(contador))
+            response = self.get_response(request)
+
+        ms = contador.segundos * 1000
+        if contador.consultas > self.max_consultas or ms > self.max_ms:
+            self._avisar(request, contador, ms)
+        return response
+
+    def _avisar(self, request, contador, ms):
+        match = request.resolver_match
+        vista = match.view_name if match else request.path
+        (sql, veces), = contador.huellas.most_common(1)
+        logger.warning(
+            "Presupuesto de consultas excedido en %s (%s %s): %d consultas, %.1f ms. "
+            "Más repetida (%dx): %s",
+            vista,
+            request.method,
+            request.get_full_path(),
+            contador.consultas,
+            ms,
+            veces,
+            sql,
+            extra={"vista": vista, "consultas": contador.consultas, "ms": ms, "huella": sql, "repeticiones": veces},
+        )
+
+
+class ReplicaMiddleware:
+    """Manda a la réplica las lecturas de listados, reportes y exportaciones del admin.
+
+    Sólo en GET/HEAD. Después de un pedido que escribe (POST, etc.) el navegador lee
+    de la primaria durante ``REPLICA_PIN_SEGUNDOS`` (cookie), así ve lo que acaba
+    de grabar aunque la réplica esté atrasada. Sin réplica configurada no hace nada.
+    """
+
+    COOKIE = "leer_primaria"
+    # Sufijos de nombres de URL del admin que sólo leen.
+    VISTAS = ("_changelist", "_exportar", "_proyeccion", "_atrasos", "_matriz")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.segundos = settings.REPLICA_PIN_SEGUNDOS
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, "_token_replica", None)
+            if token is not None:
+                replicas.restaurar(token)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and replicas.disponible():
+            response.set_cookie(self.COOKIE, "1", max_age=self.segundos, httponly=True, samesite="Lax")
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self._solo_lectura(request):
+            request._token_replica = replicas.activar()
+
+    def _solo_lectura(self, request):
+        if request.method not in ("GET", "HEAD") or self.COOKIE in request.COOKIES or not replicas.disponible():
+            return False
+        match = request.resolver_match
+        if match is None or match.namespace != "admin" or not match.url_name:
+            return False
+        return match.url_name == "index" or match.url_name.endswith(self.VISTAS)
+
+
+class ServiceWorkerMiddleware:
+    """Marca con ``X-SW-Cache: no`` las páginas que el service worker no debe guardar.
+
+    Las que mostraron mensajes ("se guardó ...") no se pueden volver a mostrar
+    desde el cache (ver ``inventario.service_worker``).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        mensajes = getattr(request, "_messages", None)
+        if mensajes is not None and mensajes.used:
+            response["X-SW-Cache"] = "no"
+        return response
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:10
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0003_alter_entregadoa_options_alter_retirobuzon_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('libro', models.CharField(choices=[('caja', 'Caja'), ('mp', 'Movimientos MP'), ('ofrendas', 'Ofrendas y Donaciones')], max_length=10)),
+                ('anio', models.PositiveSmallIntegerField(verbose_name='Año')),
+                ('mes', models.PositiveSmallIntegerField(choices=[(1, 'Enero'), (2, 'Febrero'), (3, 'Marzo'), (4, 'Abril'), (5, 'Mayo'), (6, 'Junio'), (7, 'Julio'), (8, 'Agosto'), (9, 'Septiembre'), (10, 'Octubre'), (11, 'Noviembre'), (12, 'Diciembre')])),
+                ('dia', models.PositiveSmallIntegerField(verbose_name='Día')),
+                ('ingreso', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('egreso', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('ganancia', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16, verbose_name='Interés')),
+                ('importe', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('saldo_cierre', models.DecimalField(decimal_places=2, max_digits=16, null=True, verbose_name='Saldo al cierre')),
+                ('movimientos', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumen diario',
+                'verbose_name_plural': 'Resúmenes diarios',
+                'ordering': ['libro', '-anio', '-mes', '-dia'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='resumendiario',
+            constraint=models.UniqueConstraint(fields=('libro', 'anio', 'mes', 'dia'), name='unique_resumen_por_libro_dia'),
+        ),
+    ]
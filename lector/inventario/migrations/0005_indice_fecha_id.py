@@ -0,0 +1,37 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0004_resumendiario'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='caja',
+            name='inventario__fecha_6eeafe_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='mp',
+            name='inventario__fecha_64652d_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ofrendadonacion',
+            name='inventario__fecha_036920_idx',
+        ),
+        migrations.AddIndex(
+            model_name='caja',
+            index=models.Index(fields=['fecha', 'id'], name='inventario__fecha_e8facf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mp',
+            index=models.Index(fields=['fecha', 'id'], name='inventario__fecha_74ac5e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ofrendadonacion',
+            index=models.Index(fields=['fecha', 'id'], name='inventario__fecha_17aeb8_idx'),
+        ),
+    ]
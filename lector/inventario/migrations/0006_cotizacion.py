@@ -0,0 +1,35 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:22
+
+from decimal import Decimal
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0005_indice_fecha_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Cotizacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('codigo', models.CharField(help_text='Código ISO (USD, EUR, etc.)', max_length=3, validators=[django.core.validators.RegexValidator(message='Usar código ISO 4217 en mayúsculas (p.ej., USD).', regex='^[A-Z]{3}$')])),
+                ('fecha', models.DateField()),
+                ('valor', models.DecimalField(decimal_places=4, max_digits=14, validators=[django.core.validators.MinValueValidator(Decimal('0'))], verbose_name='Cotización (ARS)')),
+            ],
+            options={
+                'verbose_name': 'Cotización',
+                'verbose_name_plural': 'Cotizaciones',
+                'ordering': ['-fecha', 'codigo'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='cotizacion',
+            constraint=models.UniqueConstraint(fields=('codigo', 'fecha'), name='unique_cotizacion_por_codigo_fecha'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0006_cotizacion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='vencimiento',
+            name='inventario__estado__2f0eaf_idx',
+        ),
+        migrations.AddIndex(
+            model_name='vencimiento',
+            index=models.Index(fields=['estado', 'fecha_vencimiento'], name='inventario__estado__5e77a9_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0007_indice_estado_fecha_vencimiento'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='compromiso',
+            name='inventario__asignac_f4c575_idx',
+        ),
+        migrations.AddIndex(
+            model_name='compromiso',
+            index=models.Index(fields=['asignacion', 'fecha', 'id'], name='inventario__asignac_251f38_idx'),
+        ),
+    ]
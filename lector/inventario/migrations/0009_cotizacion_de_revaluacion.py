@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0008_indice_compromiso_sobre_fecha'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monedaextranjera',
+            name='usd_revaluacion',
+            field=models.DecimalField(blank=True, decimal_places=4, help_text='Cotización a la que se revaluó el saldo (ARS); usd_hoy queda como la del día del movimiento.', max_digits=14, null=True, verbose_name='Cotización de revaluación'),
+        ),
+    ]
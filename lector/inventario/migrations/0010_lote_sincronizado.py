@@ -0,0 +1,34 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inventario', '0009_cotizacion_de_revaluacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoteSincronizado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lote', models.CharField(max_length=64)),
+                ('resultado', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Lote sincronizado',
+                'verbose_name_plural': 'Lotes sincronizados',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lotesincronizado',
+            constraint=models.UniqueConstraint(fields=('user', 'lote'), name='unique_lote_por_usuario'),
+        ),
+    ]
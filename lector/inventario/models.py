@@ -1,4 +1,5 @@
 from decimal import Decimal
+from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -108,7 +109,8 @@ class Caja(TimeStampedModel):
     class Meta:
         ordering = ["-fecha", "-id"]
         indexes = [
-            models.Index(fields=["fecha"]),
+            # Cubre los filtros por fecha y el paginado por cursor (fecha, id).
+            models.Index(fields=["fecha", "id"]),
         ]
 
     def __str__(self):
@@ -128,7 +130,7 @@ class MP(TimeStampedModel):
         verbose_name = "Movimiento MP"
         verbose_name_plural = "Movimientos MP"
         ordering = ["-fecha", "-id"]
-        indexes = [models.Index(fields=["fecha"])]
+        indexes = [models.Index(fields=["fecha", "id"])]
 
     def __str__(self):
         return f"{self.fecha} → {self.saldo}"
@@ -149,7 +151,8 @@ class Vencimiento(TimeStampedModel):
         indexes = [
             models.Index(fields=["fecha_vencimiento"]),
             models.Index(fields=["concepto"]),
-            models.Index(fields=["estado"]),
+            # Transiciones de estado por fecha (inventario.vencimientos) y filtros por estado.
+            models.Index(fields=["estado", "fecha_vencimiento"]),
         ]
 
     def __str__(self):
@@ -169,6 +172,14 @@ class MonedaExtranjera(TimeStampedModel):
     usd_hoy = models.DecimalField("Cotización USD hoy", max_digits=14, decimal_places=4, default=Decimal("0"), validators=MONEY_VALIDATORS)
     venta_ars = models.DecimalField("Venta (ARS)", max_digits=14, decimal_places=2, default=Decimal("0"), validators=MONEY_VALIDATORS)
     saldo_ars = models.DecimalField("Saldo (ARS)", max_digits=16, decimal_places=2)
+    usd_revaluacion = models.DecimalField(
+        "Cotización de revaluación",
+        max_digits=14,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        help_text="Cotización a la que se revaluó el saldo (ARS); usd_hoy queda como la del día del movimiento.",
+    )
 
     estado = models.ForeignKey(EstadoMoneda, on_delete=models.PROTECT, related_name="movimientos_moneda")
 
@@ -182,6 +193,25 @@ class MonedaExtranjera(TimeStampedModel):
         return f"{self.codigo} {self.fecha} → {self.saldo_ars} ARS"
 
 
+class Cotizacion(TimeStampedModel):
+    """Cotización histórica en pesos de una moneda, para revaluar ``MonedaExtranjera`` a cualquier fecha."""
+
+    codigo = models.CharField(max_length=3, validators=[UPPER_3], help_text="Código ISO (USD, EUR, etc.)")
+    fecha = models.DateField()
+    valor = models.DecimalField("Cotización (ARS)", max_digits=14, decimal_places=4, validators=MONEY_VALIDATORS)
+
+    class Meta:
+        verbose_name = "Cotización"
+        verbose_name_plural = "Cotizaciones"
+        ordering = ["-fecha", "codigo"]
+        constraints = [
+            models.UniqueConstraint(fields=["codigo", "fecha"], name="unique_cotizacion_por_codigo_fecha")
+        ]
+
+    def __str__(self):
+        return f"{self.codigo} {self.fecha} → {self.valor}"
+
+
 class AsignacionSobres(TimeStampedModel):
     sobre_n = models.PositiveSmallIntegerField(
         "Número de sobre", validators=[MinValueValidator(1), MaxValueValidator(50)], unique=True
@@ -208,7 +238,11 @@ class Compromiso(TimeStampedModel):
     class Meta:
         verbose_name_plural = "Compromisos"
         ordering = ["-fecha", "-id"]
-        indexes = [models.Index(fields=["fecha"]), models.Index(fields=["asignacion"])]
+        indexes = [
+            models.Index(fields=["fecha"]),
+            # Saldo corrido por sobre (ventana y ledger particionados por asignación) y reporte de atrasos.
+            models.Index(fields=["asignacion", "fecha", "id"]),
+        ]
 
     def __str__(self):
         return f"{self.fecha} — {self.asignacion} — {self.importe}"
@@ -235,7 +269,7 @@ class OfrendaDonacion(TimeStampedModel):
         verbose_name = "Ofrenda / Donación"
         verbose_name_plural = "Ofrendas y Donaciones"
         ordering = ["-fecha", "-id"]
-        indexes = [models.Index(fields=["fecha"])]
+        indexes = [models.Index(fields=["fecha", "id"])]
 
     def __str__(self):
         return f"{self.fecha} — {self.importe} — {self.entregado_a}"
@@ -271,3 +305,53 @@ class CuotaInac(TimeStampedModel):
 
     def __str__(self):
         return f"{self.hermano} — {self.mes}/{self.anio}"
+
+
+# ====== Resúmenes ======
+class ResumenDiario(models.Model):
+    """Totales por día de los libros principales, mantenidos por ``inventario.rollups``."""
+
+    class Libro(models.TextChoices):
+        CAJA = "caja", _("Caja")
+        MP = "mp", _("Movimientos MP")
+        OFRENDAS = "ofrendas", _("Ofrendas y Donaciones")
+
+    libro = models.CharField(max_length=10, choices=Libro.choices)
+    anio = models.PositiveSmallIntegerField("Año")
+    mes = models.PositiveSmallIntegerField(choices=CuotaInac.Mes.choices)
+    dia = models.PositiveSmallIntegerField("Día")
+    ingreso = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0.00"))
+    egreso = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0.00"))
+    ganancia = models.DecimalField("Interés", max_digits=16, decimal_places=2, default=Decimal("0.00"))
+    importe = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0.00"))
+    saldo_cierre = models.DecimalField("Saldo al cierre", max_digits=16, decimal_places=2, null=True)
+    movimientos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Resumen diario"
+        verbose_name_plural = "Resúmenes diarios"
+        ordering = ["libro", "-anio", "-mes", "-dia"]
+        constraints = [
+            models.UniqueConstraint(fields=["libro", "anio", "mes", "dia"], name="unique_resumen_por_libro_dia")
+        ]
+
+    def __str__(self):
+        return f"{self.get_libro_display()} — {self.dia}/{self.mes}/{self.anio}"
+
+
+# ====== Sincronización ======
+class LoteSincronizado(models.Model):
+    """Lote de la cola sin conexión ya guardado, con su respuesta (ver ``inventario.sincronizacion``)."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    lote = models.CharField(max_length=64)
+    resultado = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+
+    class Meta:
+        verbose_name = "Lote sincronizado"
+        verbose_name_plural = "Lotes sincronizados"
+        constraints = [models.UniqueConstraint(fields=["user", "lote"], name="unique_lote_por_usuario")]
+
+    def __str__(self):
+        return f"{self.user_id} — {self.lote}"
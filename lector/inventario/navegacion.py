@@ -0,0 +1,81 @@
+"""Sidebar del admin: árbol resuelto una vez por proceso y claves de los fragmentos cacheados.
+
+``settings.NAVEGACION`` arma los links con ``reverse_lazy`` y Unfold evaluaba cada
+uno dos veces por request (para marcar el activo y al renderizar). ``sidebar()``
+los resuelve la primera vez y devuelve siempre el mismo árbol; Unfold lo copia
+antes de marcar el link activo.
+
+``templates/admin/base.html`` cachea el HTML del sidebar con ``{% cache %}``. La
+clave (``clave_sidebar``) cambia con los permisos del usuario, el idioma, la
+versión del deploy y los links que quedan marcados como activos en esa página.
+"""
+import hashlib
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import translation
+from django.utils.functional import SimpleLazyObject
+
+_resuelto = []
+
+
+def _resolver(items):
+    resueltos = []
+    for item in items:
+        item = dict(item)
+        if "link" in item and not callable(item["link"]):
+            item["link"] = str(item["link"])
+        if "items" in item:
+            item["items"] = _resolver(item["items"])
+        resueltos.append(item)
+    return resueltos
+
+
+def sidebar(request=None):
+    """``UNFOLD["SIDEBAR"]["navigation"]``."""
+    if not _resuelto:
+        _resuelto[:] = [{**grupo, "items": _resolver(grupo.get("items", []))} for grupo in settings.NAVEGACION]
+    return _resuelto
+
+
+def _links(items):
+    for item in items:
+        if "link" in item:
+            yield item["link"]
+        yield from _links(item.get("items", []))
+
+
+def activos(path):
+    """Índices de los links que Unfold marca como activos en ``path`` (misma regla que ``_get_is_active``)."""
+    indice = reverse("admin:index")
+    links = [link for grupo in sidebar() for link in _links(grupo["items"])]
+    marcados = []
+    for i, link in enumerate(links):
+        link_path = urlparse(str(link)).path
+        if link_path == path == indice or (link_path and link_path in path and link_path != indice):
+            marcados.append(str(i))
+    return ",".join(marcados)
+
+
+def permisos(user):
+    if not (user.is_active and user.is_staff):
+        return "-"
+    if user.is_superuser:
+        return "su"
+    return hashlib.sha1("\n".join(sorted(user.get_all_permissions())).encode()).hexdigest()[:16]
+
+
+def clave_sidebar(request):
+    perms = permisos(request.user)
+    # Sin acceso al admin Unfold muestra la lista de apps, que marca la actual con el path.
+    activo = request.path if perms == "-" else activos(request.path)
+    return f"{perms}:{translation.get_language()}:{settings.DEPLOY_VERSION}:{activo}"
+
+
+def contexto(request):
+    """Context processor: claves de ``{% cache %}``, evaluadas sólo si la plantilla las usa."""
+    return {
+        "clave_sidebar": SimpleLazyObject(lambda: clave_sidebar(request)),
+        "fragmentos_timeout": settings.FRAGMENTOS_TIMEOUT,
+    }
@@ -0,0 +1,162 @@
+"""Proyección de saldo (Caja + MP) para los próximos días.
+
+Parte del último saldo de Caja y de MP, resta los vencimientos no pagados en su
+``fecha_vencimiento`` (los atrasados se cuentan hoy) y suma los compromisos
+esperados: cada sobre aporta su último importe una vez por mes, el mismo día del
+mes en que aportó la última vez.
+
+Los egresos por día se guardan en el cache como ``{fecha_vencimiento: importe}``
+con la versión ``inventario.proyeccion`` en la clave. Al guardar o borrar un
+vencimiento (señales) se recalculan desde la base sólo las fechas afectadas (la
+anterior y la nueva) y se reemplazan en el dict cacheado. El reemplazo se hace con
+un bloqueo en el cache; si otro worker lo tiene, o si el dict no está, se
+incrementa la versión y el próximo pedido lo reconstruye entero. Lo mismo para los
+cambios masivos (``update``, importaciones) con ``invalidar``.
+"""
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from . import catalogos, kpis, replicas, versiones
+from .models import Compromiso, EstadoVencimiento, Vencimiento
+
+HORIZONTE = 90
+TIMEOUT = 60 * 60
+BLOQUEO_TIMEOUT = 10
+VERSION = "inventario.proyeccion"
+CERO = Decimal("0.00")
+
+
+# ====== Vencimientos ======
+def _clave():
+    return f"proyeccion:vencimientos:{versiones.versiones(VERSION)[VERSION]}"
+
+
+def pendiente(estado_id):
+    return catalogos.nombre(EstadoVencimiento, estado_id) != kpis.ESTADO_PAGADA
+
+
+def _egresos(**filtro):
+    return dict(
+        Vencimiento.objects.filter(**filtro)
+        .exclude(estado__nombre=kpis.ESTADO_PAGADA)
+        .order_by()
+        .values("fecha_vencimiento")
+        .annotate(total=Sum("importe"))
+        .values_list("fecha_vencimiento", "total")
+    )
+
+
+def egresos_por_dia():
+    """``{fecha_vencimiento: importe}`` de los vencimientos no pagados."""
+    clave = _clave()
+    dias = cache.get(clave)
+    if dias is None:
+        with replicas.primaria():
+            dias = _egresos()
+        # ``add``: no pisa un dict que otro worker ya actualizó mientras se consultaba.
+        cache.add(clave, dias, TIMEOUT)
+    return dias
+
+
+def ajustar(anterior, nuevo):
+    """Mueve un vencimiento en la proyección. ``(fecha_vencimiento, importe)`` o ``None`` si no cuenta."""
+    if anterior != nuevo:
+        fechas = {valor[0] for valor in (anterior, nuevo) if valor is not None}
+        transaction.on_commit(lambda: _aplicar(fechas), using=Vencimiento.objects.db)
+
+
+def _aplicar(fechas):
+    """Recalcula desde la base las ``fechas`` del dict cacheado."""
+    clave = _clave()
+    bloqueo = f"{clave}:bloqueo"
+    if not cache.add(bloqueo, 1, BLOQUEO_TIMEOUT):
+        versiones.incrementar(VERSION)
+        return
+    try:
+        dias = cache.get(clave)
+        if dias is None:
+            # Puede haber una reconstrucción en curso que leyó la base antes de este cambio.
+            versiones.incrementar(VERSION)
+            return
+        with replicas.primaria():
+            actuales = _egresos(fecha_vencimiento__in=fechas)
+        for fecha in fechas:
+            dias.pop(fecha, None)
+        dias.update(actuales)
+        cache.set(clave, dias, TIMEOUT)
+    finally:
+        cache.delete(bloqueo)
+
+
+def invalidar():
+    versiones.incrementar_al_confirmar(VERSION)
+
+
+# ====== Compromisos ======
+def compromisos_esperados():
+    """``[(día del mes, importe, fecha del último aporte)]``, uno por sobre."""
+    clave = f"proyeccion:compromisos:{versiones.versiones(versiones.nombre_de(Compromiso))[versiones.nombre_de(Compromiso)]}"
+    esperados = cache.get(clave)
+    if esperados is None:
+        ultimo = Compromiso.objects.filter(asignacion=OuterRef("asignacion")).order_by("-fecha", "-pk")
+        with replicas.primaria():
+            esperados = list(
+                Compromiso.objects.order_by()
+                .values("asignacion")
+                .annotate(ultima=Max("fecha"))
+                .annotate(importe=Subquery(ultimo.values("importe")[:1]))
+                .values_list("ultima", "importe")
+            )
+        esperados = [(ultima.day, importe, ultima) for ultima, importe in esperados]
+        cache.set(clave, esperados, TIMEOUT)
+    return esperados
+
+
+def _dia_del_mes(anio, mes, dia):
+    return date(anio, mes, min(dia, calendar.monthrange(anio, mes)[1]))
+
+
+def _ingresos_por_dia(hoy, hasta):
+    ingresos = {}
+    for dia, importe, ultima in compromisos_esperados():
+        anio, mes = hoy.year, hoy.month
+        while True:
+            fecha = _dia_del_mes(anio, mes, dia)
+            if fecha > hasta:
+                break
+            # El mes del último aporte ya está cobrado.
+            if fecha >= hoy and (fecha.year, fecha.month) != (ultima.year, ultima.month):
+                ingresos[fecha] = ingresos.get(fecha, CERO) + importe
+            anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return ingresos
+
+
+# ====== Proyección ======
+def proyectar(hoy=None, dias=HORIZONTE):
+    """Devuelve ``{"caja", "mp", "inicial", "atrasado", "dias": [{fecha, egresos, ingresos, saldo}]}``."""
+    hoy = hoy or timezone.localdate()
+    hasta = hoy + timedelta(days=dias)
+    iniciales = kpis.obtener("saldo_caja", "saldo_mp")
+    caja = iniciales["saldo_caja"] or CERO
+    mp = iniciales["saldo_mp"] or CERO
+
+    egresos = egresos_por_dia()
+    atrasado = sum((importe for fecha, importe in egresos.items() if fecha < hoy), CERO)
+    ingresos = _ingresos_por_dia(hoy, hasta)
+
+    saldo = caja + mp
+    filas = []
+    fecha = hoy
+    while fecha <= hasta:
+        egreso = egresos.get(fecha, CERO) + (atrasado if fecha == hoy else CERO)
+        ingreso = ingresos.get(fecha, CERO)
+        saldo += ingreso - egreso
+        filas.append({"fecha": fecha, "egresos": egreso, "ingresos": ingreso, "saldo": saldo})
+        fecha += timedelta(days=1)
+    return {"caja": caja, "mp": mp, "inicial": caja + mp, "atrasado": atrasado, "dias": filas}
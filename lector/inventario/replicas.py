@@ -0,0 +1,75 @@
+"""Lecturas en la réplica (``DATABASES["replica"]``), si está configurada.
+
+Sólo se lee de la réplica dentro de ``lectura()`` (lo activa ``ReplicaMiddleware``
+en listados, reportes y exportaciones del admin) y sólo para los modelos de
+``inventario``; las escrituras van siempre a ``default``.
+
+Lo que se guarda en cache con la versión actual (indicadores, catálogos,
+cotizaciones, proyección, grilla de cuotas) se arma con ``primaria()``: si se
+leyera de una réplica atrasada quedaría cacheado un dato viejo con versión nueva.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA = "replica"
+APPS = {"inventario"}
+
+_lectura = ContextVar("inventario_lectura_replica", default=False)
+
+
+def disponible():
+    return REPLICA in settings.DATABASES
+
+
+def activar():
+    """Empieza a leer de la réplica; devuelve el token para ``restaurar``."""
+    return _lectura.set(True)
+
+
+def restaurar(token):
+    _lectura.reset(token)
+
+
+@contextmanager
+def lectura():
+    token = activar()
+    try:
+        yield
+    finally:
+        restaurar(token)
+
+
+@contextmanager
+def primaria():
+    token = _lectura.set(False)
+    try:
+        yield
+    finally:
+        _lectura.reset(token)
+
+
+class ReplicaRouter:
+    """``DATABASE_ROUTERS``: lecturas de ``inventario`` a la réplica dentro de ``lectura()``."""
+
+    def db_for_read(self, model, **hints):
+        if _lectura.get() and model._meta.app_label in APPS and disponible():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Explícito: sin esto Django escribiría en la base de la que se leyó la instancia.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # El esquema de la réplica llega por replicación (o copiando el archivo SQLite).
+        if db == REPLICA:
+            return False
+        return None
@@ -0,0 +1,129 @@
+"""Resúmenes diarios de Caja, MP y Ofrendas (``ResumenDiario``).
+
+Las señales de ``inventario.signals`` mantienen al día los días tocados por cada
+alta, edición o baja; ``manage.py rebuild_rollups`` los reconstruye desde cero.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from . import models
+from .models import ResumenDiario
+from .upsert import upsert
+
+BATCH_SIZE = 1000
+CERO = Decimal("0.00")
+
+# libro -> (modelo, campos del resumen que suman columnas del modelo)
+FUENTES = {
+    ResumenDiario.Libro.CAJA: (models.Caja, ["ingreso", "egreso"]),
+    ResumenDiario.Libro.MP: (models.MP, ["ingreso", "egreso", "ganancia"]),
+    ResumenDiario.Libro.OFRENDAS: (models.OfrendaDonacion, ["importe"]),
+}
+LIBRO_DE_MODELO = {model: libro for libro, (model, _) in FUENTES.items()}
+CAMPOS = ["ingreso", "egreso", "ganancia", "importe", "saldo_cierre", "movimientos"]
+
+
+def _resumenes(libro, fechas_qs):
+    """Arma los ``ResumenDiario`` (sin guardar) de las filas de ``fechas_qs``, un agregado por día."""
+    _, campos = FUENTES[libro]
+    totales = (
+        fechas_qs.order_by()
+        .values("fecha")
+        .annotate(total_movimientos=Count("pk"), **{f"total_{campo}": Sum(campo) for campo in campos})
+    )
+    cierres = {}
+    for fecha, saldo in fechas_qs.order_by("fecha", "pk").values_list("fecha", "saldo").iterator(chunk_size=BATCH_SIZE):
+        cierres[fecha] = saldo
+
+    resumenes = []
+    for fila in totales:
+        fecha = fila.pop("fecha")
+        resumenes.append(
+            ResumenDiario(
+                libro=libro,
+                anio=fecha.year,
+                mes=fecha.month,
+                dia=fecha.day,
+                saldo_cierre=cierres.get(fecha),
+                **{campo.removeprefix("total_"): valor for campo, valor in fila.items()},
+            )
+        )
+    return resumenes
+
+
+def actualizar_dias(model, fechas):
+    """Recalcula el resumen de los días indicados de un modelo fuente."""
+    libro = LIBRO_DE_MODELO[model]
+    fechas = {f for f in fechas if f is not None}
+    if not fechas:
+        return
+    with transaction.atomic(using=ResumenDiario.objects.db):
+        resumenes = _resumenes(libro, model.objects.filter(fecha__in=fechas))
+        vacios = fechas - {_fecha(r) for r in resumenes}
+        for fecha in vacios:
+            ResumenDiario.objects.filter(libro=libro, anio=fecha.year, mes=fecha.month, dia=fecha.day).delete()
+        upsert(ResumenDiario, resumenes, unique_fields=["libro", "anio", "mes", "dia"], update_fields=CAMPOS)
+
+
+def actualizar_cierres(model, cierres):
+    """Actualiza ``saldo_cierre`` después de un recálculo masivo de saldos (ver ``ledger``)."""
+    libro = LIBRO_DE_MODELO.get(model)
+    if libro is None or not cierres:
+        return
+    desde = min(cierres)
+    cambios = []
+    for resumen in ResumenDiario.objects.filter(libro=libro, anio__gte=desde.year).iterator(chunk_size=BATCH_SIZE):
+        saldo = cierres.get(_fecha(resumen))
+        if saldo is not None and resumen.saldo_cierre != saldo:
+            resumen.saldo_cierre = saldo
+            cambios.append(resumen)
+    ResumenDiario.objects.bulk_update(cambios, ["saldo_cierre"], batch_size=BATCH_SIZE)
+
+
+def reconstruir(libros=None):
+    """Borra y vuelve a generar los resúmenes. Devuelve ``{libro: días generados}``."""
+    generados = {}
+    for libro in libros or FUENTES:
+        model, _ = FUENTES[libro]
+        with transaction.atomic(using=ResumenDiario.objects.db):
+            ResumenDiario.objects.filter(libro=libro).delete()
+            resumenes = _resumenes(libro, model.objects.all())
+            ResumenDiario.objects.bulk_create(resumenes, batch_size=BATCH_SIZE)
+        generados[libro] = len(resumenes)
+    return generados
+
+
+def reconstruir_desde(model, fecha):
+    """Regenera los resúmenes de ``model`` desde ``fecha`` inclusive (p.ej. tras una importación)."""
+    libro = LIBRO_DE_MODELO[model]
+    with transaction.atomic(using=ResumenDiario.objects.db):
+        ResumenDiario.objects.filter(
+            Q(anio__gt=fecha.year)
+            | Q(anio=fecha.year, mes__gt=fecha.month)
+            | Q(anio=fecha.year, mes=fecha.month, dia__gte=fecha.day),
+            libro=libro,
+        ).delete()
+        resumenes = _resumenes(libro, model.objects.filter(fecha__gte=fecha))
+        ResumenDiario.objects.bulk_create(resumenes, batch_size=BATCH_SIZE)
+    return len(resumenes)
+
+
+def totales_mensuales(libro, anio):
+    """Totales por mes de un año, leídos de los resúmenes diarios: ``{mes: {campo: valor}}``."""
+    sumas = ["ingreso", "egreso", "ganancia", "importe"]
+    meses = defaultdict(lambda: {**{campo: CERO for campo in sumas}, "movimientos": 0, "saldo_cierre": None})
+    for resumen in ResumenDiario.objects.filter(libro=libro, anio=anio).order_by("mes", "dia"):
+        mes = meses[resumen.mes]
+        for campo in sumas:
+            mes[campo] += getattr(resumen, campo)
+        mes["movimientos"] += resumen.movimientos
+        mes["saldo_cierre"] = resumen.saldo_cierre
+    return dict(meses)
+
+
+def _fecha(resumen):
+    return date(resumen.anio, resumen.mes, resumen.dia)
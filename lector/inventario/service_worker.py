@@ -0,0 +1,59 @@
+"""Service worker del admin (``/admin/sw.js``), generado a partir del manifest de staticfiles.
+
+- Precachea los estáticos con hash del manifest (``collectstatic``); como el nombre
+  cambia con el contenido, se sirven siempre del cache sin consultar al servidor.
+- La versión es el hash del manifest: cada ``collectstatic`` con cambios instala un
+  service worker nuevo y descarta los caches viejos (lo que no cambió se copia del
+  cache anterior en lugar de descargarse de nuevo).
+- Los changelists se muestran desde el cache mientras se piden de nuevo al
+  servidor (stale-while-revalidate); el resto del admin va primero a la red.
+- Las altas de Caja y Ofrendas que fallan por falta de conexión quedan en una
+  cola (IndexedDB) y se envían juntas al volver (ver ``inventario.sincronizacion``).
+
+Sin manifest (``DEBUG`` sin ``collectstatic``) no hay nada que precachear y la
+versión es ``DEPLOY_VERSION``.
+"""
+import hashlib
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from . import sincronizacion
+
+EXTENSIONES = (".css", ".js", ".woff2", ".woff", ".ttf", ".svg", ".png", ".ico", ".jpg", ".webp", ".webmanifest")
+# Traducciones y librerías que el admin carga sólo si hacen falta: se cachean al usarlas.
+EXCLUIR = ("admin/js/vendor/select2/i18n/", "admin/js/vendor/xregexp/")
+
+
+def precache():
+    hashed = getattr(staticfiles_storage, "hashed_files", {})
+    return sorted(
+        staticfiles_storage.base_url + archivo
+        for nombre, archivo in hashed.items()
+        if nombre.endswith(EXTENSIONES) and not nombre.startswith(EXCLUIR)
+    )
+
+
+def version():
+    return getattr(staticfiles_storage, "manifest_hash", "") or settings.DEPLOY_VERSION
+
+
+@lru_cache(maxsize=1)
+def generar():
+    """``(javascript, etag)``. El manifest no cambia mientras vive el proceso."""
+    js = render_to_string(
+        "admin/sw.js",
+        {
+            "version": json.dumps(version()),
+            "static_url": json.dumps(settings.STATIC_URL),
+            "precache": json.dumps(precache(), indent=0),
+            "libros": json.dumps(sorted(sincronizacion.FORMULARIOS)),
+            "api_lote": json.dumps(reverse("api_movimientos")),
+            "max_lote": sincronizacion.MAX_MOVIMIENTOS,
+        },
+    )
+    return js, hashlib.sha256(js.encode()).hexdigest()[:32]
@@ -0,0 +1,143 @@
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import catalogos, compromisos, conexiones, cotizaciones, ledger, models, proyeccion, rollups, versiones
+
+
+# ====== Resúmenes diarios ======
+@receiver(pre_save, sender=models.Caja)
+@receiver(pre_save, sender=models.MP)
+@receiver(pre_save, sender=models.OfrendaDonacion)
+def recordar_fecha_anterior(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._fecha_anterior = sender.objects.filter(pk=instance.pk).values_list("fecha", flat=True).first()
+
+
+@receiver(post_save, sender=models.Caja)
+@receiver(post_save, sender=models.MP)
+@receiver(post_save, sender=models.OfrendaDonacion)
+def resumir_movimiento(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    rollups.actualizar_dias(sender, {instance.fecha, getattr(instance, "_fecha_anterior", None)})
+
+
+@receiver(post_delete, sender=models.Caja)
+@receiver(post_delete, sender=models.MP)
+@receiver(post_delete, sender=models.OfrendaDonacion)
+def resumir_baja(sender, instance, **kwargs):
+    rollups.actualizar_dias(sender, {instance.fecha})
+
+
+@receiver(ledger.saldos_recalculados)
+def actualizar_cierres(sender, cierres, **kwargs):
+    rollups.actualizar_cierres(sender, cierres)
+
+
+# ====== Indicadores del dashboard ======
+@receiver([post_save, post_delete], sender=models.Caja)
+@receiver([post_save, post_delete], sender=models.MP)
+@receiver([post_save, post_delete], sender=models.Vencimiento)
+@receiver([post_save, post_delete], sender=models.OfrendaDonacion)
+@receiver(ledger.saldos_recalculados)
+def invalidar_kpis(sender, **kwargs):
+    versiones.incrementar_al_confirmar(versiones.nombre_de(sender))
+
+
+# ====== Catálogos ======
+@receiver([post_save, post_delete], sender=models.EstadoVencimiento)
+@receiver([post_save, post_delete], sender=models.Concepto)
+@receiver([post_save, post_delete], sender=models.Situacion)
+@receiver([post_save, post_delete], sender=models.Descripcion)
+@receiver([post_save, post_delete], sender=models.EstadoMoneda)
+@receiver([post_save, post_delete], sender=models.RetiroBuzon)
+@receiver([post_save, post_delete], sender=models.EntregadoA)
+def invalidar_catalogos(sender, **kwargs):
+    catalogos.invalidar()
+
+
+# ====== Proyección de saldo ======
+def _en_proyeccion(fecha_vencimiento, importe, estado_id):
+    return (fecha_vencimiento, importe) if proyeccion.pendiente(estado_id) else None
+
+
+@receiver(pre_save, sender=models.Vencimiento)
+def recordar_vencimiento_anterior(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    anterior = (
+        sender.objects.filter(pk=instance.pk).values_list("fecha_vencimiento", "importe", "estado_id").first()
+    )
+    instance._proyeccion_anterior = _en_proyeccion(*anterior) if anterior else None
+
+
+@receiver(post_save, sender=models.Vencimiento)
+def proyectar_vencimiento(sender, instance, raw=False, **kwargs):
+    if raw:
+        proyeccion.invalidar()
+        return
+    nuevo = _en_proyeccion(instance.fecha_vencimiento, instance.importe, instance.estado_id)
+    proyeccion.ajustar(getattr(instance, "_proyeccion_anterior", None), nuevo)
+
+
+@receiver(post_delete, sender=models.Vencimiento)
+def quitar_vencimiento(sender, instance, **kwargs):
+    proyeccion.ajustar(_en_proyeccion(instance.fecha_vencimiento, instance.importe, instance.estado_id), None)
+
+
+# ====== Compromisos esperados y grilla de cuotas ======
+@receiver([post_save, post_delete], sender=models.Compromiso)
+@receiver([post_save, post_delete], sender=models.CuotaInac)
+def invalidar_version(sender, **kwargs):
+    versiones.incrementar_al_confirmar(versiones.nombre_de(sender))
+
+
+# ====== Saldo por sobre (COMPROMISO_SALDO_INCREMENTAL) ======
+@receiver(pre_save, sender=models.Compromiso)
+def recordar_posicion_compromiso(sender, instance, raw=False, **kwargs):
+    if raw or not compromisos.incremental():
+        return
+    if instance.saldo is None:
+        instance.saldo = ledger.CERO  # lo completa el recálculo
+    if instance.pk is not None:
+        instance._posicion_anterior = (
+            sender.objects.filter(pk=instance.pk).values_list("asignacion_id", "fecha").first()
+        )
+
+
+@receiver(post_save, sender=models.Compromiso)
+def recalcular_saldo_sobre(sender, instance, raw=False, **kwargs):
+    if raw or not compromisos.incremental():
+        return
+    anterior = getattr(instance, "_posicion_anterior", None)
+    if anterior and anterior[0] != instance.asignacion_id:
+        # Cambió de sobre: el sobre anterior pierde la fila desde su fecha vieja.
+        compromisos.recalcular(anterior[0], anterior[1])
+    desde = instance.fecha if not anterior or anterior[0] != instance.asignacion_id else min(anterior[1], instance.fecha)
+    compromisos.recalcular(instance.asignacion_id, desde)
+
+
+@receiver(post_delete, sender=models.Compromiso)
+def recalcular_saldo_sobre_baja(sender, instance, **kwargs):
+    if compromisos.incremental():
+        compromisos.recalcular(instance.asignacion_id, instance.fecha)
+
+
+# ====== Cotizaciones ======
+@receiver([post_save, post_delete], sender=models.Cotizacion)
+def invalidar_cotizaciones(sender, **kwargs):
+    cotizaciones.invalidar()
+
+
+# ====== Conexiones a la base ======
+@receiver(connection_created)
+def contar_conexion(sender, connection, **kwargs):
+    conexiones.conexion_creada(connection.alias)
+
+
+@receiver(request_started)
+def contar_request(sender, **kwargs):
+    conexiones.request_iniciado()
@@ -0,0 +1,138 @@
+"""Alta en lote de los movimientos cargados sin conexión (cola del service worker).
+
+El service worker guarda en IndexedDB las altas de Caja y Ofrendas que no se
+pudieron enviar y, al volver la conexión, las manda juntas a
+``/admin/api/movimientos/``. El lote se valida entero con los ModelForm de
+``inventario.forms`` y se inserta en una sola transacción: entran todos o ninguno.
+
+El saldo se calcula una vez por libro y por lote, como en ``import_ledger``: en
+memoria desde el saldo anterior a la primera fecha y, si el lote quedó intercalado
+con filas existentes, con un solo ``ledger.recalcular_saldos``.
+
+Si la respuesta se pierde, el service worker reenvía el mismo lote (mismo ``id``)
+y recibe el resultado guardado sin volver a insertarlo. El id se registra en
+``LoteSincronizado`` (único por usuario) en la misma transacción que los
+movimientos: o quedan los dos o ninguno.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+
+from . import forms, ledger, rollups, versiones
+from .models import LoteSincronizado
+
+# Nombre del modelo en la URL del alta (``/admin/inventario/<libro>/add/``) -> formulario.
+FORMULARIOS = {
+    "caja": forms.CajaForm,
+    "ofrendadonacion": forms.OfrendaDonacionForm,
+}
+MAX_MOVIMIENTOS = 200
+MAX_ID = LoteSincronizado._meta.get_field("lote").max_length
+
+
+class LoteInvalido(Exception):
+    def __init__(self, errores):
+        super().__init__(f"{len(errores)} movimientos con errores")
+        self.errores = errores
+
+
+class LoteEnCurso(Exception):
+    """Otro request está guardando el mismo lote."""
+
+
+def leer(datos):
+    """Valida la forma del pedido; devuelve ``(id, movimientos)`` o levanta ``ValueError``."""
+    if not isinstance(datos, dict):
+        raise ValueError("Se esperaba un objeto JSON.")
+    lote, movimientos = datos.get("id"), datos.get("movimientos")
+    if not isinstance(lote, str) or not 0 < len(lote) <= MAX_ID:
+        raise ValueError("Falta el id del lote.")
+    if not isinstance(movimientos, list) or not 0 < len(movimientos) <= MAX_MOVIMIENTOS:
+        raise ValueError(f"El lote debe tener entre 1 y {MAX_MOVIMIENTOS} movimientos.")
+    for movimiento in movimientos:
+        if (
+            not isinstance(movimiento, dict)
+            or movimiento.get("libro") not in FORMULARIOS
+            or not isinstance(movimiento.get("datos"), dict)
+        ):
+            raise ValueError("Cada movimiento lleva 'libro' (caja u ofrendadonacion) y 'datos'.")
+        # Los valores son los de un formulario: una lista u objeto rompería los campos del form.
+        if not all(valor is None or isinstance(valor, str) for valor in movimiento["datos"].values()):
+            raise ValueError("Los valores de 'datos' deben ser texto.")
+    return lote, movimientos
+
+
+def permisos(movimientos):
+    return {f"inventario.add_{libro}" for libro in {m["libro"] for m in movimientos}}
+
+
+def _validar(movimientos):
+    """``{modelo: [instancias sin guardar]}``, en el orden del lote."""
+    instancias = defaultdict(list)
+    errores = []
+    for indice, movimiento in enumerate(movimientos):
+        form = FORMULARIOS[movimiento["libro"]](data=movimiento["datos"])
+        if form.is_valid():
+            instancia = form.save(commit=False)
+            instancias[type(instancia)].append(instancia)
+        else:
+            errores.append({"indice": indice, "errores": form.errors.get_json_data()})
+    if errores:
+        raise LoteInvalido(errores)
+    return instancias
+
+
+def _insertar(model, instancias):
+    """Inserta las filas de un libro con su saldo corrido y actualiza resúmenes y versiones."""
+    # Estable: dentro de un día se respeta el orden en que se cargaron.
+    instancias.sort(key=lambda instancia: instancia.fecha)
+    primera = instancias[0].fecha
+    intercalado = model.objects.filter(fecha__gt=primera).exists()
+
+    libro = ledger.LIBROS[model]
+    saldo = ledger.saldo_anterior(model, primera)
+    for instancia in instancias:
+        saldo = saldo + libro.delta([getattr(instancia, campo) for campo in libro.campos])
+        instancia.saldo = saldo
+    model.objects.bulk_create(instancias)
+
+    # ``bulk_create`` no dispara señales: se ajustan saldos, resúmenes y versiones a mano.
+    if intercalado:
+        ledger.recalcular_saldos(model, primera)
+    rollups.actualizar_dias(model, {instancia.fecha for instancia in instancias})
+    versiones.incrementar_al_confirmar(versiones.nombre_de(model))
+
+
+def _guardado(user, lote):
+    return LoteSincronizado.objects.filter(user=user, lote=lote).values_list("resultado", flat=True).first()
+
+
+def ingresar(user, lote, movimientos):
+    """Valida e inserta el lote. Devuelve ``{"id", "creados": {libro: filas}}``."""
+    resultado = _guardado(user, lote)
+    if resultado is not None:
+        return resultado
+
+    with transaction.atomic():
+        try:
+            # Primero el id: un reenvío simultáneo espera acá a que este confirme o se deshaga.
+            with transaction.atomic():
+                registro = LoteSincronizado.objects.create(user=user, lote=lote)
+        except IntegrityError:
+            registro = None
+        else:
+            instancias = _validar(movimientos)
+            for model, filas in instancias.items():
+                _insertar(model, filas)
+            registro.resultado = {
+                "id": lote,
+                "creados": {model._meta.model_name: len(filas) for model, filas in instancias.items()},
+            }
+            registro.save(update_fields=["resultado"])
+
+    if registro is None:
+        resultado = _guardado(user, lote)
+        if resultado is None:
+            raise LoteEnCurso
+        return resultado
+    return registro.resultado
@@ -1,3 +1,271 @@
-from django.test import TestCase
+import json
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+
+from . import cotizaciones, exports, intereses, models, proyeccion, rollups
+from .models import ResumenDiario
+
+
+# ====== Resúmenes diarios ======
+class ActualizarDiasTests(TestCase):
+    def test_upsert_del_dia(self):
+        models.Caja.objects.create(fecha=date(2025, 3, 1), ingreso=Decimal("10"), saldo=Decimal("10"))
+        models.Caja.objects.create(fecha=date(2025, 3, 1), egreso=Decimal("4"), saldo=Decimal("6"))
+
+        resumen = ResumenDiario.objects.get(libro=ResumenDiario.Libro.CAJA, anio=2025, mes=3, dia=1)
+        self.assertEqual((resumen.ingreso, resumen.egreso), (Decimal("10"), Decimal("4")))
+        self.assertEqual((resumen.saldo_cierre, resumen.movimientos), (Decimal("6"), 2))
+
+    def test_sin_columnas_de_conflicto_en_mysql(self):
+        """MySQL (``ON DUPLICATE KEY``) no acepta ``unique_fields`` en Django 4.2."""
+        models.Caja.objects.create(fecha=date(2025, 3, 1), ingreso=Decimal("10"), saldo=Decimal("10"))
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False), mock.patch.object(
+            QuerySet, "bulk_create"
+        ) as bulk_create:
+            rollups.actualizar_dias(models.Caja, {date(2025, 3, 1)})
+        self.assertIsNone(bulk_create.call_args.kwargs["unique_fields"])
+        self.assertTrue(bulk_create.call_args.kwargs["update_conflicts"])
+
+
+# ====== Changelist por cursor ======
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class KeysetChangeListTests(TestCase):
+    url = "/admin/inventario/caja/"
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", password="x"))
+        filas = [models.Caja.objects.create(fecha=date(2025, 3, dia), saldo=Decimal("0")) for dia in (1, 2, 3)]
+        filas[0].delete()  # el mayor id (estimación en SQLite) queda en 3
+
+    def _changelist(self, consulta=""):
+        return self.client.get(self.url + consulta, HTTP_HOST="localhost").context["cl"]
+
+    def test_estima_solo_con_cursor(self):
+        cl = self._changelist()
+        self.assertTrue(cl.keyset)
+        self.assertEqual((cl.paginator.estimado, cl.result_count), (True, 3))
+
+    def test_paginas_numeradas_cuentan_de_verdad(self):
+        cl = self._changelist("?o=1")
+        self.assertFalse(cl.keyset)
+        self.assertEqual((cl.paginator.estimado, cl.result_count), (False, 2))
+
+
+# ====== Exportación ======
+class ExportarCsvTests(TestCase):
+    def test_neutraliza_formulas_en_el_texto(self):
+        escritor = exports._Csv(["descripcion", "importe"])
+        escritor.inicio()
+        filas = [["=HYPERLINK(\"x\")", Decimal("-5.00")], ["-3 de ajuste", Decimal("2")], ["@SUMA", 1], ["Luz", -1]]
+        self.assertEqual(
+            escritor.bloque(filas).splitlines(),
+            ["\"'=HYPERLINK(\"\"x\"\")\",-5.00", "'-3 de ajuste,2", "'@SUMA,1", "Luz,-1"],
+        )
+
+
+# ====== Cotizaciones ======
+class CargarCotizacionesTests(TestCase):
+    def test_actualiza_la_fecha_repetida(self):
+        cotizaciones.cargar([("USD", date(2025, 3, 1), Decimal("1000"))])
+        cotizaciones.cargar([("USD", date(2025, 3, 1), Decimal("1050")), ("USD", date(2025, 3, 2), Decimal("1060"))])
+        self.assertEqual(
+            list(models.Cotizacion.objects.order_by("fecha").values_list("valor", flat=True)),
+            [Decimal("1050"), Decimal("1060")],
+        )
+
+    def test_sin_columnas_de_conflicto_en_mysql(self):
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False), mock.patch.object(
+            QuerySet, "bulk_create"
+        ) as bulk_create:
+            cotizaciones.cargar([("USD", date(2025, 3, 1), Decimal("1000"))])
+        self.assertIsNone(bulk_create.call_args.kwargs["unique_fields"])
+
+    def test_revaluar_conserva_la_cotizacion_del_movimiento(self):
+        estado = models.EstadoMoneda.objects.create(nombre="Tenencia")
+        fila = models.MonedaExtranjera.objects.create(
+            codigo="USD", fecha=date(2025, 3, 1), ingreso=Decimal("10"), usd_hoy=Decimal("1000"),
+            saldo_ars=Decimal("10000"), estado=estado,
+        )
+        cotizaciones.cargar([("USD", date(2025, 3, 5), Decimal("1200"))])
+        self.assertEqual(cotizaciones.revaluar(date(2025, 3, 5)), (1, []))
+        fila.refresh_from_db()
+        self.assertEqual(
+            (fila.usd_hoy, fila.usd_revaluacion, fila.saldo_ars), (Decimal("1000"), Decimal("1200"), Decimal("12000"))
+        )
+
+
+# ====== Intereses MP ======
+class DevengarTests(TestCase):
+    # 36,5 % anual sobre 100.000: 100 por día.
+    tasas = intereses.Tasas([(date(2025, 1, 1), Decimal("36.5"))])
+
+    def test_volver_a_correr_un_mes_cortado_acredita_el_resto(self):
+        models.MP.objects.create(fecha=date(2025, 10, 1), ingreso=Decimal("100000"), saldo=Decimal("100000"))
+        primera = intereses.devengar(date(2025, 10, 1), date(2025, 10, 18), self.tasas)
+        self.assertEqual([a.interes for a in primera], [Decimal("1800.00")])
+
+        segunda = intereses.devengar(date(2025, 10, 1), date(2025, 10, 31), self.tasas)
+        self.assertEqual([(a.inicio, a.interes) for a in segunda], [(date(2025, 10, 19), Decimal("1323.40"))])
+        self.assertFalse(segunda[0].existente)
+
+        tercera = intereses.devengar(date(2025, 10, 1), date(2025, 10, 31), self.tasas)
+        self.assertTrue(tercera[0].existente)
+        self.assertEqual(models.MP.objects.get(fecha=date(2025, 10, 31)).saldo, Decimal("103123.40"))
+
+
+# ====== Proyección de saldo ======
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class EgresosPorDiaTests(TestCase):
+    def setUp(self):
+        self.catalogos = {
+            "concepto": models.Concepto.objects.create(nombre="Luz"),
+            "descripcion": models.Descripcion.objects.create(nombre="Factura"),
+            "estado": models.EstadoVencimiento.objects.create(nombre="Pendiente"),
+            "situacion": models.Situacion.objects.create(nombre="Normal"),
+        }
+
+    def _vencimiento(self, importe, fecha_vencimiento):
+        with self.captureOnCommitCallbacks(execute=True):
+            return models.Vencimiento.objects.create(
+                fecha=date(2025, 3, 1), fecha_vencimiento=fecha_vencimiento, importe=Decimal(importe), **self.catalogos
+            )
+
+    def test_cada_cambio_recalcula_solo_sus_fechas(self):
+        self._vencimiento("100", date(2025, 3, 10))
+        self.assertEqual(proyeccion.egresos_por_dia(), {date(2025, 3, 10): Decimal("100")})
+
+        with mock.patch.object(proyeccion, "_egresos", wraps=proyeccion._egresos) as egresos:
+            segundo = self._vencimiento("50", date(2025, 3, 12))
+            self.assertEqual(
+                proyeccion.egresos_por_dia(), {date(2025, 3, 10): Decimal("100"), date(2025, 3, 12): Decimal("50")}
+            )
+            segundo.fecha_vencimiento = date(2025, 3, 10)
+            with self.captureOnCommitCallbacks(execute=True):
+                segundo.save()
+            self.assertEqual(proyeccion.egresos_por_dia(), {date(2025, 3, 10): Decimal("150")})
+            with self.captureOnCommitCallbacks(execute=True):
+                segundo.delete()
+            self.assertEqual(proyeccion.egresos_por_dia(), {date(2025, 3, 10): Decimal("100")})
+
+        # Sin reconstruir el dict: una consulta por cambio, sólo por las fechas que tocó.
+        self.assertEqual(
+            [llamada.kwargs for llamada in egresos.call_args_list],
+            [
+                {"fecha_vencimiento__in": {date(2025, 3, 12)}},
+                {"fecha_vencimiento__in": {date(2025, 3, 10), date(2025, 3, 12)}},
+                {"fecha_vencimiento__in": {date(2025, 3, 10)}},
+            ],
+        )
+
+
+# ====== Grilla de cuotas ======
+# Sin el manifest de collectstatic.
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class MatrizCuotasTests(TestCase):
+    url = "/admin/inventario/cuotainac/matriz/"
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", password="x"))
+        models.CuotaInac.objects.create(hermano="Ana", anio=2025, mes=1)
+
+    def _marcar(self, anio, **datos):
+        response = self.client.post(f"{self.url}?anio={anio}", datos, HTTP_HOST="localhost", follow=True)
+        return [str(m) for m in response.context["messages"]]
+
+    def test_cuenta_solo_las_agregadas(self):
+        mensajes = self._marcar(2025, celda=["1|Ana", "2|Ana"], hermano_nuevo="Beto", mes_nuevo=["3"])
+        self.assertIn("2 cuotas marcadas como pagas.", mensajes)
+        self.assertEqual(models.CuotaInac.objects.count(), 3)
+
+    def test_rechaza_celdas_invalidas(self):
+        mensajes = self._marcar(2025, celda=["13|Ana", "0|Ana", "2|" + "x" * 200], hermano_nuevo="Beto", mes_nuevo=["0", "4"])
+        self.assertTrue(any(m.startswith("No se marcaron:") for m in mensajes))
+        self.assertIn("1 cuotas marcadas como pagas.", mensajes)
+        self.assertEqual(
+            set(models.CuotaInac.objects.values_list("hermano", "anio", "mes")), {("Ana", 2025, 1), ("Beto", 2025, 4)}
+        )
+
+    def test_rechaza_el_anio_fuera_de_rango(self):
+        mensajes = self._marcar(5000, celda=["2|Ana"])
+        self.assertTrue(any(m.startswith("No se marcaron:") for m in mensajes))
+        self.assertEqual(models.CuotaInac.objects.count(), 1)
+
+
+# ====== Movimientos cargados sin conexión ======
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class MovimientosLoteTests(TestCase):
+    url = "/admin/api/movimientos/"
+
+    def setUp(self):
+        user = User.objects.create_user("tesorero", password="x", is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename="add_caja"))
+        self.client.force_login(user)
+        models.Caja.objects.create(fecha=date(2025, 3, 1), ingreso=Decimal("100"), saldo=Decimal("100"))
+        models.Caja.objects.create(fecha=date(2025, 3, 20), ingreso=Decimal("5"), saldo=Decimal("105"))
+
+    def _enviar(self, datos):
+        return self.client.post(self.url, json.dumps(datos), content_type="application/json", HTTP_HOST="localhost")
+
+    def _caja(self, fecha, ingreso="0", egreso="0"):
+        return {"libro": "caja", "datos": {"fecha": fecha, "descripcion": "", "ingreso": ingreso, "egreso": egreso}}
+
+    def _saldos(self):
+        return list(models.Caja.objects.order_by("fecha", "pk").values_list("fecha", "saldo"))
+
+    def test_lote_intercalado_recalcula_saldos_y_resumenes(self):
+        response = self._enviar({"id": "l1", "movimientos": [self._caja("2025-03-18", ingreso="10"), self._caja("2025-03-05", egreso="3.50")]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"id": "l1", "creados": {"caja": 2}})
+        self.assertEqual(
+            self._saldos(),
+            [
+                (date(2025, 3, 1), Decimal("100")),
+                (date(2025, 3, 5), Decimal("96.50")),
+                (date(2025, 3, 18), Decimal("106.50")),
+                (date(2025, 3, 20), Decimal("111.50")),
+            ],
+        )
+        cierres = dict(
+            ResumenDiario.objects.filter(libro=ResumenDiario.Libro.CAJA).values_list("dia", "saldo_cierre")
+        )
+        self.assertEqual(cierres, {1: Decimal("100"), 5: Decimal("96.50"), 18: Decimal("106.50"), 20: Decimal("111.50")})
+
+    def test_reenvio_con_el_mismo_id_no_duplica(self):
+        lote = {"id": "l2", "movimientos": [self._caja("2025-03-21", ingreso="1")]}
+        primera = self._enviar(lote)
+        # El id queda en la base: no depende de lo que sobreviva en el cache.
+        cache.clear()
+        segunda = self._enviar(lote)
+        self.assertEqual(segunda.status_code, 200)
+        self.assertEqual(segunda.json(), primera.json())
+        self.assertEqual(models.Caja.objects.count(), 3)
+
+    def test_movimiento_invalido_no_guarda_nada(self):
+        response = self._enviar({"id": "l3", "movimientos": [self._caja("2025-03-21", ingreso="1"), self._caja("x", ingreso="-1")]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["indice"] for error in response.json()["errores"]], [1])
+        self.assertEqual(models.Caja.objects.count(), 2)
+        # El id no queda tomado: el mismo lote corregido se acepta.
+        response = self._enviar({"id": "l3", "movimientos": [self._caja("2025-03-21", ingreso="1")]})
+        self.assertEqual(response.status_code, 200)
+
+    def test_pedido_mal_formado(self):
+        for datos in (
+            [],
+            {"id": "l4", "movimientos": []},
+            {"id": "l4", "movimientos": [{"libro": "mp", "datos": {}}]},
+            {"id": "l4", "movimientos": [{"libro": "caja", "datos": {"fecha": ["2025-01-01"]}}]},
+            {"id": "l4", "movimientos": [{"libro": "caja", "datos": {"ingreso": {"valor": 1}}}]},
+        ):
+            with self.subTest(datos=datos):
+                self.assertEqual(self._enviar(datos).status_code, 400)
+        response = self.client.post(self.url, "{no es json", content_type="application/json", HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(models.Caja.objects.count(), 2)
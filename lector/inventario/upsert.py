@@ -0,0 +1,20 @@
+"""``bulk_create(update_conflicts=True)`` que funciona en SQLite y en MySQL.
+
+SQLite (``ON CONFLICT (...) DO UPDATE``) necesita las columnas del conflicto. MySQL
+(``ON DUPLICATE KEY UPDATE``) usa cualquier clave única de la tabla y Django 4.2
+rechaza ``unique_fields`` con ``NotSupportedError``.
+"""
+from django.db import connections, router
+
+
+def upsert(model, objetos, unique_fields, update_fields, batch_size=None):
+    db = router.db_for_write(model)
+    if not connections[db].features.supports_update_conflicts_with_target:
+        unique_fields = None
+    return model.objects.using(db).bulk_create(
+        objetos,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
@@ -0,0 +1,152 @@
+"""Valuación por lotes de las tenencias de ``MonedaExtranjera``.
+
+Cada fila se interpreta así, por ``codigo`` y en orden ``(fecha, id)``:
+
+- ``compra_usd`` abre un lote con costo ``compra_ars``.
+- ``ingreso`` (sin compra) abre un lote valuado a ``usd_hoy`` de ese día.
+- ``egreso_usd`` consume lotes (FIFO o costo promedio) y realiza la diferencia
+  contra ``venta_ars`` (o ``egreso_usd * usd_hoy`` si no hubo venta).
+
+El resultado no realizado de cada fila es la tenencia después del movimiento
+valuada a ``usd_hoy`` (o a la cotización que se pase) menos el costo que queda.
+Todo sale de una sola lectura ordenada de la tabla.
+"""
+from collections import deque
+from decimal import Decimal
+
+from .models import MonedaExtranjera
+
+FIFO = "fifo"
+PROMEDIO = "promedio"
+METODOS = [FIFO, PROMEDIO]
+
+CERO = Decimal("0")
+CENTAVO = Decimal("0.01")
+
+
+def _pesos(valor):
+    return valor.quantize(CENTAVO)
+
+
+class Posicion:
+    """Lotes abiertos de un código."""
+
+    def __init__(self, metodo):
+        self.metodo = metodo
+        self.lotes = deque()  # FIFO: [cantidad, costo total]
+        self.cantidad = CERO
+        self.costo = CERO
+
+    def comprar(self, cantidad, costo):
+        if cantidad <= 0:
+            return
+        self.cantidad += cantidad
+        self.costo += costo
+        if self.metodo == FIFO:
+            self.lotes.append([cantidad, costo])
+
+    def vender(self, cantidad):
+        """Saca ``cantidad`` de la posición y devuelve ``(costo de lo vendido, faltante)``."""
+        faltante = max(cantidad - self.cantidad, CERO)
+        cantidad -= faltante
+        if cantidad <= 0:
+            return CERO, faltante
+        if self.metodo == PROMEDIO:
+            costo = self.costo * cantidad / self.cantidad
+        else:
+            costo = CERO
+            pendiente = cantidad
+            while pendiente > 0:
+                lote = self.lotes[0]
+                if lote[0] <= pendiente:
+                    pendiente -= lote[0]
+                    costo += lote[1]
+                    self.lotes.popleft()
+                else:
+                    parcial = lote[1] * pendiente / lote[0]
+                    lote[0] -= pendiente
+                    lote[1] -= parcial
+                    costo += parcial
+                    pendiente = CERO
+        self.cantidad -= cantidad
+        self.costo = self.costo - costo if self.cantidad else CERO
+        return costo, faltante
+
+
+class Valuacion:
+    """Resultado de una fila."""
+
+    __slots__ = ("pk", "codigo", "fecha", "tenencia", "costo", "cotizacion", "realizado", "no_realizado", "faltante")
+
+    def __init__(self, **valores):
+        for campo in self.__slots__:
+            setattr(self, campo, valores.get(campo))
+
+    @property
+    def valor_ars(self):
+        return _pesos(self.tenencia * self.cotizacion)
+
+
+CAMPOS = ["pk", "codigo", "fecha", "ingreso", "compra_usd", "compra_ars", "egreso_usd", "usd_hoy", "venta_ars"]
+
+
+def valuar(metodo=FIFO, queryset=None, cotizaciones=None):
+    """Devuelve ``[Valuacion]`` de cada fila, en orden ``(codigo, fecha, id)``.
+
+    ``cotizaciones`` (``{codigo: valor}``) reemplaza a ``usd_hoy`` para valuar lo no
+    realizado, p.ej. para ver toda la historia a la cotización de hoy.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método de valuación desconocido: {metodo}")
+    queryset = MonedaExtranjera.objects.all() if queryset is None else queryset
+    cotizaciones = cotizaciones or {}
+    posiciones = {}
+    resultado = []
+    filas = queryset.order_by("codigo", "fecha", "pk").values_list(*CAMPOS).iterator(chunk_size=2000)
+    for pk, codigo, fecha, ingreso, compra_usd, compra_ars, egreso_usd, usd_hoy, venta_ars in filas:
+        posicion = posiciones.setdefault(codigo, Posicion(metodo))
+        posicion.comprar(compra_usd, compra_ars)
+        posicion.comprar(ingreso, ingreso * usd_hoy)
+
+        realizado = CERO
+        faltante = CERO
+        if egreso_usd:
+            costo, faltante = posicion.vender(egreso_usd)
+            vendido = egreso_usd - faltante
+            ingreso_venta = venta_ars * vendido / egreso_usd if venta_ars else vendido * usd_hoy
+            realizado = ingreso_venta - costo
+
+        cotizacion = cotizaciones.get(codigo, usd_hoy)
+        resultado.append(
+            Valuacion(
+                pk=pk,
+                codigo=codigo,
+                fecha=fecha,
+                tenencia=posicion.cantidad,
+                costo=_pesos(posicion.costo),
+                cotizacion=cotizacion,
+                realizado=_pesos(realizado),
+                no_realizado=_pesos(posicion.cantidad * cotizacion - posicion.costo),
+                faltante=faltante,
+            )
+        )
+    return resultado
+
+
+def resumen(valuaciones):
+    """Totales por código: ``{codigo: {tenencia, costo, valor_ars, realizado, no_realizado}}``.
+
+    Lo no realizado es el de la última fila de cada código (la posición vigente).
+    """
+    totales = {}
+    for v in valuaciones:
+        total = totales.setdefault(v.codigo, {"realizado": CERO})
+        total["realizado"] += v.realizado
+        total.update(
+            tenencia=v.tenencia,
+            costo=v.costo,
+            cotizacion=v.cotizacion,
+            valor_ars=v.valor_ars,
+            no_realizado=v.no_realizado,
+        )
+    return totales
@@ -0,0 +1,60 @@
+"""Transiciones automáticas de ``Vencimiento.estado`` según ``fecha_vencimiento``.
+
+Cada transición es un único ``UPDATE`` sobre el conjunto de filas que corresponde,
+apoyado en el índice ``(estado, fecha_vencimiento)``. Es idempotente: correrlo de
+nuevo el mismo día no toca nada.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import catalogos, versiones
+from .models import EstadoVencimiento, Vencimiento
+
+logger = logging.getLogger("inventario.vencimientos")
+
+VENCIDA = "Vencida"
+A_VENCER = "A vencer"
+# Estados de un vencimiento todavía sin resolver (ver 0002_seed_catalogos).
+PENDIENTES = ["Llegó", "No llegó", "Ver por internet", A_VENCER]
+DIAS_AVISO = 7
+
+
+def _ids(nombres):
+    por_nombre = {nombre: pk for pk, nombre in catalogos.opciones(EstadoVencimiento)}
+    return [por_nombre[nombre] for nombre in nombres if nombre in por_nombre]
+
+
+def actualizar_estados(hoy=None, dias_aviso=DIAS_AVISO):
+    """Pasa a "Vencida" los pendientes ya vencidos y a "A vencer" los que vencen en ``dias_aviso`` días.
+
+    Devuelve ``{estado destino: filas actualizadas}``.
+    """
+    hoy = hoy or timezone.localdate()
+    vencida, a_vencer = (_ids([nombre]) for nombre in (VENCIDA, A_VENCER))
+    if not vencida or not a_vencer:
+        raise EstadoVencimiento.DoesNotExist(f'Faltan los estados "{VENCIDA}" y/o "{A_VENCER}".')
+    pendientes = _ids(PENDIENTES)
+    ahora = timezone.now()
+
+    with transaction.atomic(using=Vencimiento.objects.db):
+        vencidos = (
+            Vencimiento.objects.filter(estado_id__in=pendientes, fecha_vencimiento__lt=hoy)
+            .update(estado_id=vencida[0], updated_at=ahora)
+        )
+        # También vuelven a "A vencer" las vencidas cuya fecha se corrió hacia adelante.
+        proximos = (
+            Vencimiento.objects.filter(
+                estado_id__in=[pk for pk in pendientes + vencida if pk != a_vencer[0]],
+                fecha_vencimiento__range=(hoy, hoy + timedelta(days=dias_aviso)),
+            )
+            .update(estado_id=a_vencer[0], updated_at=ahora)
+        )
+        if vencidos or proximos:
+            # update() no dispara señales.
+            versiones.incrementar_al_confirmar(versiones.nombre_de(Vencimiento))
+
+    logger.info("Vencimientos: %d pasaron a %s, %d a %s", vencidos, VENCIDA, proximos, A_VENCER)
+    return {VENCIDA: vencidos, A_VENCER: proximos}
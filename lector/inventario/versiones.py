@@ -0,0 +1,54 @@
+"""Contadores de versión compartidos entre workers a través del cache de Django.
+
+Cada nombre (p.ej. ``inventario.caja``) tiene un número que se incrementa al escribir;
+las claves cacheadas que incluyen ese número quedan obsoletas sin tener que borrarlas.
+
+``cache.incr`` sólo es atómico en Redis o Memcached; en el cache de archivos dos
+incrementos simultáneos leen el mismo valor y uno se pierde. Por eso cada
+incremento suma un salto al azar: aunque se pierda, el valor final no coincide
+con el que vio otro worker entre los dos y no se reutiliza un snapshot viejo.
+"""
+import random
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+SALTO_MAXIMO = 1 << 20
+
+
+def _clave(nombre):
+    return f"version:{nombre}"
+
+
+def _inicial():
+    # Si el cache pierde la clave, arrancar desde un valor nuevo evita reutilizar versiones viejas.
+    return time.time_ns()
+
+
+def versiones(*nombres):
+    """Devuelve ``{nombre: versión}`` con una sola lectura al cache."""
+    claves = {_clave(nombre): nombre for nombre in nombres}
+    actuales = cache.get_many(list(claves))
+    for clave in claves.keys() - actuales.keys():
+        cache.add(clave, _inicial(), timeout=None)
+        actuales[clave] = cache.get(clave)
+    return {nombre: actuales[clave] for clave, nombre in claves.items()}
+
+
+def incrementar(nombre):
+    clave = _clave(nombre)
+    try:
+        cache.incr(clave, random.randint(1, SALTO_MAXIMO))
+    except ValueError:
+        cache.add(clave, _inicial(), timeout=None)
+
+
+def incrementar_al_confirmar(nombre):
+    """Incrementa cuando la transacción en curso se confirma, para no cachear datos sin commitear."""
+    transaction.on_commit(lambda: incrementar(nombre))
+
+
+def nombre_de(model):
+    return model._meta.label_lower
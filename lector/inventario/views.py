@@ -0,0 +1,84 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import add_never_cache_headers
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import condition, require_GET, require_POST
+
+from . import compromisos, conexiones, kpis, proyeccion, service_worker, sincronizacion
+
+
+@require_GET
+@never_cache
+@staff_member_required
+def metricas_conexiones(request):
+    """Conexiones a la base del worker que atiende el pedido (ver ``inventario.conexiones``)."""
+    return JsonResponse(conexiones.metricas())
+
+
+@require_GET
+@condition(etag_func=lambda request: service_worker.generar()[1])
+def admin_sw(request):
+    """Service worker del admin (ver ``inventario.service_worker``).
+
+    ``no-cache``: el navegador revalida con el ETag y recibe 304 mientras no cambie el manifest.
+    """
+    response = HttpResponse(service_worker.generar()[0], content_type="application/javascript")
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+# ====== Reportes asíncronos (JSON) ======
+# Con ASGI no ocupan un hilo del worker mientras esperan a la base. Los decoradores
+# de Django 4.2 (``never_cache``, ``staff_member_required``) son sólo sincrónicos.
+def _autorizado(request, permiso):
+    user = request.user
+    return user.is_active and user.is_staff and user.has_perm(permiso)
+
+
+async def _json(request, permiso, datos):
+    if request.method != "GET":
+        return JsonResponse({"error": "Sólo GET"}, status=405)
+    if not await sync_to_async(_autorizado)(request, permiso):
+        raise PermissionDenied
+    response = JsonResponse(await datos())
+    add_never_cache_headers(response)
+    return response
+
+
+async def kpis_json(request):
+    """Indicadores del dashboard (los mismos del index, desde el cache)."""
+    return await _json(request, "inventario.view_caja", sync_to_async(kpis.obtener))
+
+
+async def proyeccion_json(request):
+    return await _json(request, "inventario.view_caja", sync_to_async(proyeccion.proyectar))
+
+
+async def atrasos_json(request):
+    async def datos():
+        return {"sobres": await compromisos.aatrasos()}
+
+    return await _json(request, "inventario.view_compromiso", datos)
+
+
+# ====== Movimientos cargados sin conexión ======
+@require_POST
+@never_cache
+def movimientos_lote(request):
+    """Alta en lote desde la cola del service worker (ver ``inventario.sincronizacion``)."""
+    try:
+        lote, movimientos = sincronizacion.leer(json.loads(request.body))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if not all(_autorizado(request, permiso) for permiso in sincronizacion.permisos(movimientos)):
+        raise PermissionDenied
+    try:
+        return JsonResponse(sincronizacion.ingresar(request.user, lote, movimientos))
+    except sincronizacion.LoteInvalido as e:
+        return JsonResponse({"id": lote, "errores": e.errores}, status=400)
+    except sincronizacion.LoteEnCurso:
+        return JsonResponse({"id": lote, "error": "El lote se está guardando."}, status=409)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import time
 from pathlib import Path
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
@@ -59,6 +60,7 @@ INSTALLED_APPS = [
 UNFOLD = {
     "SITE_TITLE": "Lector OC",
     "SITE_HEADER": "Sinaptic",
+    "DASHBOARD_CALLBACK": "inventario.kpis.dashboard_callback",
     "SITE_LOGO": {
         "light": "/static/images/inac-logo.png",  # light mode
         "dark": "/static/images/inac-logo-dark.png",  # dark mode
@@ -125,6 +127,11 @@ UNFOLD = {
                         "icon": "inventory_2",
                         "link": reverse_lazy("admin:inventario_mp_changelist"),
                     },
+                    {
+                        "title": _("Proyección de saldo"),
+                        "icon": "trending_up",
+                        "link": reverse_lazy("admin:inventario_caja_proyeccion"),
+                    },
                     {
                         "title": _("Vencimiento"),
                         "icon": "inventory_2",
@@ -135,11 +142,21 @@ UNFOLD = {
                         "icon": "inventory_2",
                         "link": reverse_lazy("admin:inventario_monedaextranjera_changelist"),
                     },
+                    {
+                        "title": _("Cotizaciones"),
+                        "icon": "currency_exchange",
+                        "link": reverse_lazy("admin:inventario_cotizacion_changelist"),
+                    },
                     {
                         "title": _("Compromisos"),
                         "icon": "inventory_2",
                         "link": reverse_lazy("admin:inventario_compromiso_changelist"),
                     },
+                    {
+                        "title": _("Atrasos por sobre"),
+                        "icon": "report",
+                        "link": reverse_lazy("admin:inventario_compromiso_atrasos"),
+                    },
                     {
                         "title": _("Ofrendas y Donaciones"),
                         "icon": "inventory_2",
@@ -155,6 +172,16 @@ UNFOLD = {
                         "icon": "inventory_2",
                         "link": reverse_lazy("admin:inventario_cuotainac_changelist"),
                     },
+                    {
+                        "title": _("Cuotas INAC por año"),
+                        "icon": "grid_on",
+                        "link": reverse_lazy("admin:inventario_cuotainac_matriz"),
+                    },
+                    {
+                        "title": _("Resúmenes diarios"),
+                        "icon": "summarize",
+                        "link": reverse_lazy("admin:inventario_resumendiario_changelist"),
+                    },
                 ],
             },
             {
@@ -203,19 +230,53 @@ UNFOLD = {
     },
 }
 
+# Unfold pide el sidebar en cada request a inventario.navegacion.sidebar, que devuelve
+# este árbol con los reverse_lazy ya resueltos (una vez por proceso).
+NAVEGACION = UNFOLD["SIDEBAR"]["navigation"]
+UNFOLD["SIDEBAR"]["navigation"] = "inventario.navegacion.sidebar"
+
+# Fragmentos cacheados del admin ({% cache %} en templates/admin/base.html). La versión del
+# deploy va en la clave: cada deploy arranca con fragmentos nuevos. Sin DEPLOY_VERSION (ni el
+# commit que expone Render) se usa la hora de arranque.
+DEPLOY_VERSION = env("DEPLOY_VERSION", default=env("RENDER_GIT_COMMIT", default="")) or str(int(time.time()))
+FRAGMENTOS_TIMEOUT = env.int("FRAGMENTOS_TIMEOUT", default=60 * 60 * 24)
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'inventario.middleware.QueryBudgetMiddleware',
+    'inventario.middleware.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'inventario.middleware.ServiceWorkerMiddleware',
 ]
 
 ROOT_URLCONF = 'lector.urls'
 
+# Presupuesto de consultas por request del admin (inventario.middleware.QueryBudgetMiddleware)
+QUERY_BUDGET = env.int("QUERY_BUDGET", default=30)
+QUERY_BUDGET_MS = env.int("QUERY_BUDGET_MS", default=500)
+QUERY_BUDGET_PATH_PREFIX = "/admin/"
+
+# Guardar Compromiso.saldo como saldo corrido por sobre al grabar (si no, se calcula al mostrar).
+# Al activarlo, correr una vez ``manage.py rebuild_pledge_balances``.
+COMPROMISO_SALDO_INCREMENTAL = env.bool("COMPROMISO_SALDO_INCREMENTAL", default=False)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "inventario": {"handlers": ["console"], "level": env("INVENTARIO_LOG_LEVEL", default="INFO")},
+    },
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -227,6 +288,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'inventario.navegacion.contexto',
             ],
         },
     },
@@ -248,6 +310,11 @@ WSGI_APPLICATION = 'lector.wsgi.application'
 
 USE_AZURE_DB = env.bool("USE_AZURE_DB", default=False)
 
+# Servido con workers ASGI (ver gunicorn.conf.py). Cada request ASGI corre el ORM en un hilo
+# propio, así que una conexión persistente nunca se reutiliza y quedaría abierta: sin persistencia.
+ASGI = env.bool("ASGI", default=False)
+DB_CONN_MAX_AGE = env.int("DB_CONN_MAX_AGE", default=0 if ASGI else 300)
+
 if USE_AZURE_DB:
     DATABASES = {
         "default": {
@@ -257,23 +324,72 @@ if USE_AZURE_DB:
             "PASSWORD": "$QlBnD0W$tK03Hq4",
             "HOST": env("AZURE_MYSQL_HOST"),
             "PORT": env("AZURE_MYSQL_PORT", default="3306"),
+            # Conexiones persistentes: el handshake TLS se hace una vez por hilo y no en cada request.
+            # Mantener por debajo del wait_timeout del servidor; 0 vuelve a una conexión por request.
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            # Antes de reutilizar una conexión se prueba con un ping; si se cayó se abre otra.
+            "CONN_HEALTH_CHECKS": True,
             "OPTIONS": {
                 "ssl": {
                     "ca": os.path.join(BASE_DIR, "certs", "DigiCertGlobalRootCA.crt.pem"),
                 },
-                "ssl_mode": "VERIFY_IDENTITY"
+                "ssl_mode": "VERIFY_IDENTITY",
+                "connect_timeout": env.int("DB_CONNECT_TIMEOUT", default=10),
             },
         }
     }
 else:
     SQLITE_PATH = Path("/home/site/wwwroot/db.sqlite3")
+    # WAL: los lectores no bloquean a quien escribe y viceversa; entre escrituras
+    # se espera hasta busy_timeout en lugar de fallar con "database is locked".
+    SQLITE_OPTIONS = {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "busy_timeout": env.int("SQLITE_BUSY_TIMEOUT_MS", default=5000),
+            "synchronous": "NORMAL",
+            "mmap_size": env.int("SQLITE_MMAP_SIZE", default=128 * 1024 * 1024),
+            "cache_size": -env.int("SQLITE_CACHE_KB", default=20000),
+            "temp_store": "MEMORY",
+        },
+        "transaction_mode": "IMMEDIATE",
+    }
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            'ENGINE': 'inventario.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "OPTIONS": SQLITE_OPTIONS,
         }
     }
 
+# Réplica de lectura (opcional) para listados, reportes y exportaciones del admin (inventario.replicas).
+# Azure: AZURE_MYSQL_REPLICA_HOST. Local: SQLITE_REPLICA_PATH apuntando a una copia de db.sqlite3.
+if USE_AZURE_DB and env("AZURE_MYSQL_REPLICA_HOST", default=""):
+    DATABASES["replica"] = {**DATABASES["default"], "HOST": env("AZURE_MYSQL_REPLICA_HOST")}
+elif not USE_AZURE_DB and env("SQLITE_REPLICA_PATH", default=""):
+    # Sólo lectura (mode=ro) y BEGIN DEFERRED: con IMMEDIATE cada lectura tomaría el lock de escritura.
+    # journal_mode no se puede cambiar desde una conexión de sólo lectura: lo fija la copia.
+    DATABASES["replica"] = {
+        "ENGINE": "inventario.backends.sqlite3",
+        "NAME": f"file:{Path(env('SQLITE_REPLICA_PATH')).resolve()}?mode=ro",
+        "OPTIONS": {
+            "pragmas": {k: v for k, v in SQLITE_OPTIONS["pragmas"].items() if k != "journal_mode"},
+            "transaction_mode": "DEFERRED",
+        },
+    }
+if "replica" in DATABASES:
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["inventario.replicas.ReplicaRouter"]
+# Segundos que un navegador lee de la primaria después de escribir.
+REPLICA_PIN_SEGUNDOS = env.int("REPLICA_PIN_SEGUNDOS", default=15)
+
+# Cache compartido entre workers de gunicorn (indicadores del dashboard, versiones).
+# Para Redis/Memcached: CACHE_URL=redis://..., ver https://django-environ.readthedocs.io
+CACHES = {
+    "default": env.cache("CACHE_URL", default=f"filecache://{BASE_DIR / '.cache'}"),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -17,76 +17,16 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 from django.views.generic import RedirectView
-from django.views.decorators.http import require_GET
-from django.http import HttpResponse
 
-@require_GET
-def admin_sw(request):
-    js = r"""
-const CACHE_VERSION = "v1.0.0";
-const RUNTIME_CACHE = `hftecno-admin-${CACHE_VERSION}`;
-
-self.addEventListener("install", (event) => {
-  event.waitUntil((async () => {
-    const cache = await caches.open(RUNTIME_CACHE);
-    await cache.addAll(["/admin/"]);
-    self.skipWaiting();
-  })());
-});
-
-self.addEventListener("activate", (event) => {
-  event.waitUntil((async () => {
-    const keys = await caches.keys();
-    await Promise.all(keys
-      .filter(k => k.startsWith("hftecno-admin-") && k !== RUNTIME_CACHE)
-      .map(k => caches.delete(k)));
-    self.clients.claim();
-  })());
-});
-
-self.addEventListener("fetch", (event) => {
-  const req = event.request;
-  const url = new URL(req.url);
-
-  // Solo manejar GET dentro de /admin/
-  if (req.method !== "GET") return;
-  if (!url.pathname.startsWith("/admin/")) return;
-
-  const acceptsHTML = req.headers.get("accept")?.includes("text/html");
-  const isStatic = url.pathname.startsWith("/static/");
-
-  if (acceptsHTML) {
-    event.respondWith((async () => {
-      try {
-        const fresh = await fetch(req);
-        const cache = await caches.open(RUNTIME_CACHE);
-        cache.put(req, fresh.clone());
-        return fresh;
-      } catch (e) {
-        const cached = await caches.match(req);
-        return cached || caches.match("/admin/");
-      }
-    })());
-    return;
-  }
-
-  if (isStatic) {
-    event.respondWith((async () => {
-      const cached = await caches.match(req);
-      if (cached) return cached;
-      const fresh = await fetch(req);
-      const cache = await caches.open(RUNTIME_CACHE);
-      cache.put(req, fresh.clone());
-      return fresh;
-    })());
-    return;
-  }
-});
-"""
-    return HttpResponse(js, content_type="application/javascript")
+from inventario import views as inventario_views
 
 urlpatterns = [
-    path("admin/sw.js", admin_sw, name="admin_sw"),
+    path("admin/sw.js", inventario_views.admin_sw, name="admin_sw"),
+    path("admin/metricas/conexiones/", inventario_views.metricas_conexiones, name="metricas_conexiones"),
+    path("admin/api/kpis/", inventario_views.kpis_json, name="api_kpis"),
+    path("admin/api/proyeccion/", inventario_views.proyeccion_json, name="api_proyeccion"),
+    path("admin/api/atrasos/", inventario_views.atrasos_json, name="api_atrasos"),
+    path("admin/api/movimientos/", inventario_views.movimientos_lote, name="api_movimientos"),
     path('admin/', admin.site.urls),
 ]
 
@@ -0,0 +1,229 @@
+{% autoescape off %}// Generado por inventario/service_worker.py a partir del manifest de staticfiles.
+const VERSION = {{ version }};
+const STATIC_CACHE = `hftecno-static-${VERSION}`;
+const PAGES_CACHE = `hftecno-admin-${VERSION}`;
+const STATIC_URL = {{ static_url }};
+const PRECACHE = {{ precache }};
+const LOTE = 20;
+// Nombre con el hash de 12 caracteres de ManifestStaticFilesStorage: contenido inmutable.
+const CON_HASH = /\.[0-9a-f]{12}\.[^./]+$/;
+const CHANGELIST = /^\/admin\/[^/]+\/[^/]+\/$/;
+// Altas que se encolan sin conexión (inventario.sincronizacion).
+const LIBROS = {{ libros }};
+const ALTA = new RegExp(`^/admin/inventario/(${LIBROS.join("|")})/add/$`);
+const API_LOTE = {{ api_lote }};
+const MAX_LOTE = {{ max_lote }};
+const SYNC_TAG = "movimientos";
+
+async function precachear(cache, url) {
+  // Lo que no cambió entre versiones ya está en el cache anterior.
+  const previo = await caches.match(url);
+  if (previo) return cache.put(url, previo);
+  return cache.add(url).catch(() => null);
+}
+
+self.addEventListener("install", (event) => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(STATIC_CACHE);
+    for (let i = 0; i < PRECACHE.length; i += LOTE) {
+      await Promise.all(PRECACHE.slice(i, i + LOTE).map((url) => precachear(cache, url)));
+    }
+    self.skipWaiting();
+  })());
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil((async () => {
+    const keys = await caches.keys();
+    await Promise.all(keys
+      .filter((k) => k.startsWith("hftecno-") && k !== STATIC_CACHE && k !== PAGES_CACHE)
+      .map((k) => caches.delete(k)));
+    self.clients.claim();
+  })());
+});
+
+function guardable(resp) {
+  return resp.ok
+    && resp.type === "basic"
+    && (resp.headers.get("content-type") || "").includes("text/html")
+    && resp.headers.get("X-SW-Cache") !== "no";
+}
+
+async function cacheFirst(req) {
+  const cached = await caches.match(req);
+  if (cached) return cached;
+  const resp = await fetch(req);
+  if (resp.ok) {
+    const cache = await caches.open(STATIC_CACHE);
+    cache.put(req, resp.clone());
+  }
+  return resp;
+}
+
+async function networkFirst(req) {
+  try {
+    const resp = await fetch(req);
+    if (guardable(resp)) {
+      const cache = await caches.open(PAGES_CACHE);
+      cache.put(req, resp.clone());
+    }
+    return resp;
+  } catch (e) {
+    return (await caches.match(req)) || (await caches.match("/admin/")) || Response.error();
+  }
+}
+
+async function staleWhileRevalidate(event, req) {
+  const cache = await caches.open(PAGES_CACHE);
+  const cached = await cache.match(req);
+  const fresh = fetch(req).then(async (resp) => {
+    if (guardable(resp)) {
+      await cache.put(req, resp.clone());
+    } else {
+      await cache.delete(req);  // p.ej. sesión vencida: redirige al login
+    }
+    return resp;
+  });
+  if (cached) {
+    event.waitUntil(fresh.catch(() => null));
+    return cached;
+  }
+  return fresh.catch(async () => (await caches.match("/admin/")) || Response.error());
+}
+
+self.addEventListener("fetch", (event) => {
+  const req = event.request;
+  const url = new URL(req.url);
+  if (url.origin !== self.location.origin) return;
+
+  if (req.method !== "GET") {
+    if (!url.pathname.startsWith("/admin/")) return;
+    const alta = req.method === "POST" && url.pathname.match(ALTA);
+    const copia = alta ? req.clone() : null;
+    event.respondWith(fetch(req).then(async (resp) => {
+      // Después de grabar (o de cerrar sesión) las páginas guardadas quedan viejas.
+      await caches.delete(PAGES_CACHE);
+      return resp;
+    }, (error) => {
+      if (copia) return encolar(copia, alta[1]);
+      throw error;
+    }));
+    return;
+  }
+
+  if (url.pathname.startsWith(STATIC_URL)) {
+    if (CON_HASH.test(url.pathname)) event.respondWith(cacheFirst(req));
+    return;
+  }
+
+  if (!url.pathname.startsWith("/admin/") || url.pathname === "/admin/sw.js") return;
+  const html = req.mode === "navigate" || (req.headers.get("accept") || "").includes("text/html");
+  if (!html) return;
+  event.respondWith(CHANGELIST.test(url.pathname) ? staleWhileRevalidate(event, req) : networkFirst(req));
+});
+
+// ====== Cola de altas sin conexión (IndexedDB) ======
+function abrirCola() {
+  return new Promise((resolve, reject) => {
+    const pedido = indexedDB.open("hftecno-cola", 1);
+    pedido.onupgradeneeded = () => pedido.result.createObjectStore("movimientos", { keyPath: "clave", autoIncrement: true });
+    pedido.onsuccess = () => resolve(pedido.result);
+    pedido.onerror = () => reject(pedido.error);
+  });
+}
+
+// ``accion(store)`` puede devolver un IDBRequest: se resuelve con su resultado al confirmar.
+async function cola(modo, accion) {
+  const db = await abrirCola();
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction("movimientos", modo);
+    const pedido = accion(tx.objectStore("movimientos"));
+    tx.oncomplete = () => { db.close(); resolve(pedido && pedido.result); };
+    tx.onerror = tx.onabort = () => { db.close(); reject(tx.error); };
+  });
+}
+
+async function encolar(req, libro) {
+  const form = await req.formData();
+  const datos = {};
+  for (const [campo, valor] of form.entries()) {
+    // Sin el token ni los botones (_save, _addanother, ...).
+    if (campo !== "csrfmiddlewaretoken" && !campo.startsWith("_") && typeof valor === "string") datos[campo] = valor;
+  }
+  await cola("readwrite", (store) => store.add({ libro, datos, csrf: form.get("csrfmiddlewaretoken"), creado: Date.now() }));
+  if (self.registration.sync) self.registration.sync.register(SYNC_TAG).catch(() => null);
+  avisar();
+  const listado = `/admin/inventario/${libro}/`;
+  return new Response(
+    `<!doctype html><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Sin conexión</title>
+<p>Sin conexión: el movimiento quedó guardado en este teléfono y se envía solo cuando vuelva la conexión.</p>
+<p><a href="${listado}add/">Cargar otro</a> · <a href="${listado}">Volver al listado</a></p>`,
+    { headers: { "Content-Type": "text/html; charset=utf-8" } },
+  );
+}
+
+async function avisar() {
+  const movimientos = await cola("readonly", (store) => store.getAll()).catch(() => []);
+  const estado = {
+    tipo: "cola",
+    pendientes: movimientos.filter((m) => !m.errores).length,
+    rechazados: movimientos.filter((m) => m.errores),
+  };
+  for (const cliente of await self.clients.matchAll()) cliente.postMessage(estado);
+}
+
+// El token de la última página abierta: el guardado con el movimiento puede ser de una sesión vieja.
+let csrf = null;
+let enviando = null;
+
+function sincronizar() {
+  if (!enviando) enviando = enviar().finally(() => { enviando = null; avisar(); });
+  return enviando;
+}
+
+async function enviar() {
+  for (;;) {
+    const pendientes = (await cola("readonly", (store) => store.getAll())).filter((m) => !m.errores);
+    if (!pendientes.length) return;
+    // Un lote enviado cuya respuesta no llegó se reenvía igual: el servidor lo reconoce por el id.
+    let id = (pendientes.find((m) => m.lote) || {}).lote;
+    let lote = pendientes.filter((m) => id && m.lote === id);
+    if (!id) {
+      id = self.crypto.randomUUID();
+      lote = pendientes.slice(0, MAX_LOTE).map((m) => ({ ...m, lote: id }));
+      await cola("readwrite", (store) => lote.forEach((m) => store.put(m)));
+    }
+    const resp = await fetch(API_LOTE, {
+      method: "POST",
+      credentials: "same-origin",
+      headers: { "Content-Type": "application/json", "X-CSRFToken": csrf || lote[lote.length - 1].csrf },
+      body: JSON.stringify({ id, movimientos: lote.map((m) => ({ libro: m.libro, datos: m.datos })) }),
+    });
+    if (resp.ok) {
+      await cola("readwrite", (store) => lote.forEach((m) => store.delete(m.clave)));
+      await caches.delete(PAGES_CACHE);
+    } else if (resp.status === 400) {
+      // No se guardó nada: los inválidos quedan apartados con sus errores y el resto va en otro lote.
+      const cuerpo = await resp.json().catch(() => ({}));
+      const errores = {};
+      for (const e of cuerpo.errores || []) errores[e.indice] = e.errores;
+      const general = Object.keys(errores).length ? null : { __all__: [{ message: cuerpo.error || "Lote rechazado" }] };
+      await cola("readwrite", (store) => lote.forEach((m, i) => store.put({ ...m, lote: null, errores: errores[i] || general })));
+    } else {
+      return;  // sesión vencida o CSRF (403), lote en curso (409), error del servidor: se reintenta después
+    }
+  }
+}
+
+self.addEventListener("sync", (event) => {
+  if (event.tag === SYNC_TAG) event.waitUntil(sincronizar());
+});
+
+self.addEventListener("message", (event) => {
+  const { tipo, clave, csrf: token } = event.data || {};
+  if (token) csrf = token;
+  if (tipo === "sincronizar") event.waitUntil(sincronizar().catch(() => null));
+  if (tipo === "descartar") event.waitUntil(cola("readwrite", (store) => store.delete(clave)).then(avisar));
+});
+{% endautoescape %}